@@ -1,17 +1,17 @@
 import os
 import logging
-import json
 import uuid
 from datetime import datetime
 from flask import Flask, render_template, request, jsonify, session, redirect, url_for, flash
 from flask_login import LoginManager, login_user, logout_user, login_required, current_user
+from sqlalchemy.orm import raiseload, undefer
 from openai_service import generate_query, format_response
 from database_connectors import get_connector, test_connection
 from models import db, Chat, ChatMessage, User
-from utils import DateTimeEncoder
+from utils import json_dumps
 
 # Configure logging
-logging.basicConfig(level=logging.DEBUG)
+logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Initialize Flask app
@@ -42,6 +42,14 @@ login_manager.login_view = 'auth'
 def load_user(user_id):
     return db.session.query(User).filter(User.id == user_id).first()
 
+def is_valid_chat_id(chat_id):
+    """Check that a chat ID parses as a UUID, which PostgreSQL requires before comparing it"""
+    try:
+        uuid.UUID(str(chat_id))
+        return True
+    except ValueError:
+        return False
+
 # Routes
 @app.route('/')
 def landing():
@@ -78,16 +86,11 @@ def login():
             
             # Also restore the database credentials
             if recent_chat.db_credentials:
-                try:
-                    credentials = json.loads(recent_chat.db_credentials)
-                    session['database_credentials'] = {
-                        'type': recent_chat.db_type,
-                        'credentials': credentials
-                    }
-                    return redirect(url_for('chat'))
-                except json.JSONDecodeError:
-                    # If there's an issue with the credentials, still go to index page
-                    pass
+                session['database_credentials'] = {
+                    'type': recent_chat.db_type,
+                    'credentials': recent_chat.db_credentials
+                }
+                return redirect(url_for('chat'))
         
         # No valid recent chat found, go to database selection page
         return redirect(url_for('index'))
@@ -166,11 +169,9 @@ def test_env_db():
     try:
         # Create empty credentials dict for PostgreSQL
         credentials = {}
-        connector = get_connector('postgresql', credentials)
-        connector.connect()
-        
-        # Test a simple query
-        result, success, error = connector.execute_query("SELECT current_database(), current_user;")
+        with get_connector('postgresql', credentials) as connector:
+            # Test a simple query
+            result, success, error = connector.execute_query("SELECT current_database(), current_user;")
         
         if success:
             return jsonify({
@@ -217,7 +218,7 @@ def test_db_connection():
                 id=chat_id,
                 db_type=db_type,
                 db_name=credentials.get('db_name', db_type.upper()),
-                db_credentials=json.dumps(credentials),  # Store credentials as JSON string
+                db_credentials=credentials,  # Stored in a JSON column
                 user_id=current_user.id if current_user.is_authenticated else None  # Link to user if logged in
             )
             
@@ -233,11 +234,11 @@ def test_db_connection():
                 # Perform schema analysis in the background
                 from openai_service import analyze_schema
                 schema_analysis = analyze_schema(db_type, schema_info)
-                logger.info(f"Schema analysis completed successfully for {db_type}")
+                logger.info("Schema analysis completed successfully for %s", db_type)
                 
                 # For debugging
                 analysis_summary = schema_analysis.get('schema_summary', 'No schema summary available')
-                logger.info(f"Schema analysis summary: {analysis_summary[:100]}...")
+                logger.info("Schema analysis summary: %s...", analysis_summary[:100])
                 
                 return jsonify({
                     'success': True,
@@ -292,12 +293,12 @@ def get_chat_history():
         # Convert the messages to dictionaries
         message_list = [message.to_dict() for message in messages]
         
-        # Use the custom DateTimeEncoder to handle datetime objects
+        # json_dumps handles datetime and Decimal values
         return app.response_class(
-            response=json.dumps({
+            response=json_dumps({
                 'success': True,
                 'history': message_list
-            }, cls=DateTimeEncoder),
+            }),
             status=200,
             mimetype='application/json'
         )
@@ -313,23 +314,26 @@ def get_previous_chats():
     """Get a list of previous chat sessions"""
     try:
         # If the user is logged in, show all chats for the user
+        # Message counts come back with the chats in the same query, and the
+        # messages themselves must never be loaded just to list the chats
+        list_options = (undefer(Chat.message_count), raiseload(Chat.messages))
         if current_user.is_authenticated:
-            chats = db.session.query(Chat).filter(Chat.user_id == current_user.id).order_by(Chat.updated_at.desc()).all()
+            chats = db.session.query(Chat).options(*list_options).filter(Chat.user_id == current_user.id).order_by(Chat.updated_at.desc()).all()
         # If not logged in, but there's a chat_id in the session, show that chat
         elif 'chat_id' in session:
-            chats = db.session.query(Chat).filter(Chat.id == session['chat_id']).order_by(Chat.updated_at.desc()).all()
+            chats = db.session.query(Chat).options(*list_options).filter(Chat.id == session['chat_id']).order_by(Chat.updated_at.desc()).all()
         else:
             chats = []
         
         # Convert the chats to dictionaries
         chat_list = [chat.to_dict() for chat in chats]
         
-        # Use custom DateTimeEncoder to handle datetime objects
+        # json_dumps handles datetime and Decimal values
         return app.response_class(
-            response=json.dumps({
+            response=json_dumps({
                 'success': True,
                 'chats': chat_list
-            }, cls=DateTimeEncoder),
+            }),
             status=200,
             mimetype='application/json'
         )
@@ -345,7 +349,9 @@ def load_chat(chat_id):
     """Load a specific chat session"""
     try:
         # Check if the chat exists
-        chat = db.session.query(Chat).filter(Chat.id == chat_id).first()
+        chat = None
+        if is_valid_chat_id(chat_id):
+            chat = db.session.query(Chat).filter(Chat.id == chat_id).first()
         
         if not chat:
             return jsonify({
@@ -365,68 +371,56 @@ def load_chat(chat_id):
         
         # Restore the database credentials for this chat
         if chat.db_credentials:
-            try:
-                credentials = json.loads(chat.db_credentials)
-                session['database_credentials'] = {
-                    'type': chat.db_type,
-                    'credentials': credentials
-                }
-                
-                # Test the connection to make sure it's still valid
-                success, message = test_connection(chat.db_type, credentials)
-                
-                if success:
-                    try:
-                        # Get the database connector and fetch schema information
-                        connector = get_connector(chat.db_type, credentials)
-                        schema_info = connector.get_schema()
-                        
-                        # Perform schema analysis in the background
-                        from openai_service import analyze_schema
-                        schema_analysis = analyze_schema(chat.db_type, schema_info)
-                        logger.info(f"Schema analysis completed successfully for {chat.db_type} during chat reload")
-                    except Exception as schema_error:
-                        logger.exception("Error analyzing schema during chat reload")
-                        # Continue even if schema analysis fails
-                else:
-                    # If the connection fails, we should inform the user but still load the chat
-                    logger.warning(f"Failed to reconnect to database: {message}")
-                    return app.response_class(
-                        response=json.dumps({
-                            'success': True,
-                            'chat': chat.to_dict(),
-                            'warning': f"Could not reconnect to the database: {message}"
-                        }, cls=DateTimeEncoder),
-                        status=200,
-                        mimetype='application/json'
-                    )
-            except json.JSONDecodeError:
-                logger.error(f"Invalid JSON in db_credentials for chat {chat_id}")
+            credentials = chat.db_credentials
+            session['database_credentials'] = {
+                'type': chat.db_type,
+                'credentials': credentials
+            }
+            
+            # Test the connection to make sure it's still valid
+            success, message = test_connection(chat.db_type, credentials)
+            
+            if success:
+                try:
+                    # Get the database connector and fetch schema information
+                    connector = get_connector(chat.db_type, credentials)
+                    schema_info = connector.get_schema()
+                    
+                    # Perform schema analysis in the background
+                    from openai_service import analyze_schema
+                    schema_analysis = analyze_schema(chat.db_type, schema_info)
+                    logger.info("Schema analysis completed successfully for %s during chat reload", chat.db_type)
+                except Exception as schema_error:
+                    logger.exception("Error analyzing schema during chat reload")
+                    # Continue even if schema analysis fails
+            else:
+                # If the connection fails, we should inform the user but still load the chat
+                logger.warning("Failed to reconnect to database: %s", message)
                 return app.response_class(
-                    response=json.dumps({
+                    response=json_dumps({
                         'success': True,
                         'chat': chat.to_dict(),
-                        'warning': "Could not restore database connection. The stored credentials are invalid."
-                    }, cls=DateTimeEncoder),
+                        'warning': f"Could not reconnect to the database: {message}"
+                    }),
                     status=200,
                     mimetype='application/json'
                 )
         else:
             return app.response_class(
-                response=json.dumps({
+                response=json_dumps({
                     'success': True,
                     'chat': chat.to_dict(),
                     'warning': "No database credentials were stored with this chat."
-                }, cls=DateTimeEncoder),
+                }),
                 status=200,
                 mimetype='application/json'
             )
         
         return app.response_class(
-            response=json.dumps({
+            response=json_dumps({
                 'success': True,
                 'chat': chat.to_dict()
-            }, cls=DateTimeEncoder),
+            }),
             status=200,
             mimetype='application/json'
         )
@@ -461,7 +455,9 @@ def process_query():
         chat_id = session['chat_id']
         
         # Security check: verify the user has access to this chat
-        chat = db.session.query(Chat).filter(Chat.id == chat_id).first()
+        chat = None
+        if is_valid_chat_id(chat_id):
+            chat = db.session.query(Chat).filter(Chat.id == chat_id).first()
         if not chat:
             return jsonify({
                 'success': False,
@@ -493,10 +489,10 @@ def process_query():
             db.session.commit()
             
             return app.response_class(
-                response=json.dumps({
+                response=json_dumps({
                     'success': False,
                     'message': explanation
-                }, cls=DateTimeEncoder),
+                }),
                 status=400,
                 mimetype='application/json'
             )
@@ -518,12 +514,12 @@ def process_query():
             db.session.commit()
             
             return app.response_class(
-                response=json.dumps({
+                response=json_dumps({
                     'success': False,
                     'message': f"Query generation succeeded, but execution failed: {error_message}",
                     'query': query,
                     'explanation': explanation
-                }, cls=DateTimeEncoder),
+                }),
                 status=400,
                 mimetype='application/json'
             )
@@ -554,13 +550,20 @@ def process_query():
         
         db.session.commit()
         
+        response_data = {
+            'success': True,
+            'query': query,
+            'explanation': explanation,
+            'result': formatted_result
+        }
+        
+        # DynamoDB reads that stopped early report the key to resume from
+        last_evaluated_key = getattr(connector, 'last_evaluated_key', None)
+        if last_evaluated_key:
+            response_data['last_evaluated_key'] = last_evaluated_key
+        
         return app.response_class(
-            response=json.dumps({
-                'success': True,
-                'query': query,
-                'explanation': explanation,
-                'result': formatted_result
-            }, cls=DateTimeEncoder),
+            response=json_dumps(response_data),
             status=200,
             mimetype='application/json'
         )
@@ -582,10 +585,89 @@ def process_query():
                 logger.exception("Error saving error message")
         
         return app.response_class(
-            response=json.dumps({
+            response=json_dumps({
                 'success': False,
                 'message': f"Error processing query: {str(e)}"
-            }, cls=DateTimeEncoder),
+            }),
+            status=500,
+            mimetype='application/json'
+        )
+
+@app.route('/execute_batch', methods=['POST'])
+def execute_batch():
+    """Execute a parameterized write statement for many rows in one batch"""
+    try:
+        if 'database_credentials' not in session:
+            return jsonify({
+                'success': False,
+                'message': "No database connection. Please reconnect."
+            })
+        
+        data = request.json
+        query = data.get('query')
+        rows = data.get('rows') or []
+        db_info = session['database_credentials']
+        db_type = db_info['type']
+        
+        if not query:
+            return jsonify({
+                'success': False,
+                'message': "A query is required."
+            }), 400
+        
+        if not isinstance(rows, list):
+            return jsonify({
+                'success': False,
+                'message': "Rows must be a list."
+            }), 400
+        
+        # Rows are lists of values in placeholder order, or objects whose values
+        # are taken in the order of "columns" (default: the first row's keys)
+        columns = data.get('columns')
+        params = []
+        for row in rows:
+            if isinstance(row, list):
+                params.append(tuple(row))
+            elif isinstance(row, dict):
+                if columns is None:
+                    columns = list(row)
+                if set(row) != set(columns):
+                    return jsonify({
+                        'success': False,
+                        'message': f"Every row must have exactly the keys: {', '.join(columns)}."
+                    }), 400
+                params.append(tuple(row[column] for column in columns))
+            else:
+                return jsonify({
+                    'success': False,
+                    'message': "Each row must be a list of values or an object."
+                }), 400
+        
+        connector = get_connector(db_type, db_info['credentials'])
+        if not hasattr(connector, 'execute_many'):
+            return jsonify({
+                'success': False,
+                'message': f"Batch execution is not supported for {db_type}."
+            }), 400
+        
+        result, success, error_message = connector.execute_many(query, params)
+        
+        return app.response_class(
+            response=json_dumps({
+                'success': success,
+                'result': result,
+                'message': error_message
+            }),
+            status=200 if success else 400,
+            mimetype='application/json'
+        )
+    except Exception as e:
+        logger.exception("Error executing batch")
+        return app.response_class(
+            response=json_dumps({
+                'success': False,
+                'message': f"Error executing batch: {str(e)}"
+            }),
             status=500,
             mimetype='application/json'
         )
@@ -1157,7 +1239,7 @@ def get_schema_info():
                     'message': 'No database connection found. Please connect to a database first.'
                 }), 400
         except Exception as e:
-            logger.error(f"Error initializing database credentials from environment: {str(e)}")
+            logger.error("Error initializing database credentials from environment: %s", e)
             return jsonify({
                 'success': False,
                 'message': 'No database connection found. Please connect to a database first.'
@@ -1167,12 +1249,12 @@ def get_schema_info():
     db_type = db_credentials.get('type')
     credentials = db_credentials.get('credentials', {})
     
-    logger.info(f"Retrieving schema for database type: {db_type}")
+    logger.info("Retrieving schema for database type: %s", db_type)
     
     # Get connector for the database
     connector = get_connector(db_type, credentials)
     if not connector:
-        logger.error(f"Failed to get connector for database type: {db_type}")
+        logger.error("Failed to get connector for database type: %s", db_type)
         return jsonify({
             'success': False,
             'message': f'Unsupported database type: {db_type}'
@@ -1184,8 +1266,8 @@ def get_schema_info():
         schema_info = connector.get_schema()
         
         # Log the schema structure for debugging
-        logger.info(f"Schema info type: {type(schema_info)}")
-        logger.info(f"Schema info content: {schema_info}")
+        logger.info("Schema info type: %s", type(schema_info))
+        logger.info("Schema info content: %s", schema_info)
         
         # Format the schema information for the explorer
         logger.info("Formatting schema for explorer")
@@ -1211,7 +1293,7 @@ def get_schema_info():
             
             # Create a dict structure that matches what the formatter expects
             schema_info = {'tables': table_dict}
-            logger.info(f"Converted schema info: {schema_info}")
+            logger.info("Converted schema info: %s", schema_info)
         
         formatted_schema = format_schema_for_explorer(db_type, schema_info)
         
@@ -1221,7 +1303,7 @@ def get_schema_info():
             'db_type': db_type
         })
     except Exception as e:
-        logger.error(f"Error getting schema info: {str(e)}", exc_info=True)
+        logger.error("Error getting schema info: %s", e, exc_info=True)
         return jsonify({
             'success': False,
             'message': f'Error retrieving schema information: {str(e)}'
@@ -1,11 +1,75 @@
 import os
+from sqlalchemy import String, inspect, text
+from sqlalchemy.schema import AddConstraint
 from app import app
 from models import db
 
+# Id columns older versions created as varchar(36), stored as uuid on PostgreSQL
+UUID_COLUMNS = {
+    "users": ["id"],
+    "chats": ["id", "user_id"],
+    "chat_messages": ["id", "chat_id"],
+}
+
+# Indexes earlier versions created that the models no longer declare
+RETIRED_INDEXES = ["ix_chats_updated_at"]
+
+def convert_ids_to_uuid():
+    """Convert varchar id columns left by older versions to PostgreSQL's native uuid type"""
+    with db.engine.begin() as conn:
+        inspector = inspect(conn)
+        pending = [
+            (table, column["name"])
+            for table, names in UUID_COLUMNS.items()
+            for column in inspector.get_columns(table)
+            if column["name"] in names and isinstance(column["type"], String)
+        ]
+        if not pending:
+            return
+        
+        # A foreign key can't join a varchar column to a uuid one, so drop them
+        # while the columns are converted and put them back afterwards
+        for table in UUID_COLUMNS:
+            for foreign_key in inspector.get_foreign_keys(table):
+                conn.execute(text(f'ALTER TABLE {table} DROP CONSTRAINT "{foreign_key["name"]}"'))
+        
+        for table, column in pending:
+            conn.execute(text(f"ALTER TABLE {table} ALTER COLUMN {column} TYPE uuid USING {column}::uuid"))
+        
+        for table in UUID_COLUMNS:
+            for foreign_key in db.metadata.tables[table].foreign_key_constraints:
+                conn.execute(AddConstraint(foreign_key))
+        
+        print(f"Converted {len(pending)} id columns to uuid")
+
+def convert_credentials_to_jsonb():
+    """Convert the text db_credentials column left by older versions to jsonb"""
+    with db.engine.begin() as conn:
+        column = next(c for c in inspect(conn).get_columns("chats") if c["name"] == "db_credentials")
+        if isinstance(column["type"], String):
+            conn.execute(text(
+                "ALTER TABLE chats ALTER COLUMN db_credentials TYPE jsonb USING db_credentials::jsonb"
+            ))
+            print("Converted chats.db_credentials to jsonb")
+
 print("Creating database tables...")
 
 # This is necessary to create the tables in the PostgreSQL database
 with app.app_context():
     # Create all tables
     db.create_all()
+    
+    if db.engine.dialect.name == "postgresql":
+        convert_ids_to_uuid()
+        convert_credentials_to_jsonb()
+    
+    # Drop indexes replaced by newer ones so writes stop maintaining them
+    with db.engine.begin() as conn:
+        for name in RETIRED_INDEXES:
+            conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+    
+    # create_all() leaves existing tables alone, so add any indexes they lack
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(db.engine, checkfirst=True)
     print("Tables created successfully!")
\ No newline at end of file
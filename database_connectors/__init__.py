@@ -1,13 +1,59 @@
 import importlib.util
 import logging
+from concurrent.futures import ThreadPoolExecutor
 
 # Configure logging
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 # Create connector cache to avoid redundant imports
 _connector_cache = {}
 
+# Database type to the module path and class name of its connector. Built once
+# at import; the modules themselves are only imported when first used.
+_CONNECTOR_MAP = {
+    # Relational databases
+    'postgresql': ('database_connectors.relational', 'PostgreSQLConnector'),
+    'mysql': ('database_connectors.relational', 'MySQLConnector'),
+    'sqlserver': ('database_connectors.relational', 'SQLServerConnector'),
+    'oracle': ('database_connectors.relational', 'OracleConnector'),
+    'sqlite': ('database_connectors.relational', 'SQLiteConnector'),
+    'redshift': ('database_connectors.relational', 'RedshiftConnector'),
+    'cloudsql': ('database_connectors.relational', 'CloudSQLConnector'),
+    'mariadb': ('database_connectors.relational', 'MariaDBConnector'),
+    'db2': ('database_connectors.relational', 'DB2Connector'),
+    
+    # NoSQL databases
+    'mongodb': ('database_connectors.nosql', 'MongoDBConnector'),
+    'cassandra': ('database_connectors.nosql', 'CassandraConnector'),
+    'redis': ('database_connectors.nosql', 'RedisConnector'),
+    'elasticsearch': ('database_connectors.nosql', 'ElasticsearchConnector'),
+    'dynamodb': ('database_connectors.nosql', 'DynamoDBConnector'),
+    'couchbase': ('database_connectors.nosql', 'CouchbaseConnector'),
+    
+    # Graph databases
+    'neo4j': ('database_connectors.graph', 'Neo4jConnector'),
+    'tigergraph': ('database_connectors.graph', 'TigerGraphConnector'),
+    
+    # Data warehouse
+    'snowflake': ('database_connectors.datawarehouse', 'SnowflakeConnector'),
+    'bigquery': ('database_connectors.datawarehouse', 'BigQueryConnector'),
+    'synapse': ('database_connectors.datawarehouse', 'SynapseConnector'),
+    
+    # Cloud databases
+    'cosmosdb': ('database_connectors.cloud', 'CosmosDBConnector'),
+    'firestore': ('database_connectors.cloud', 'FirestoreConnector'),
+    'supabase': ('database_connectors.cloud', 'SupabaseConnector'),
+    'heroku': ('database_connectors.heroku', 'HerokuConnector'),
+    'crunchybridge': ('database_connectors.crunchybridge', 'CrunchyBridgeConnector'),
+    'neon': ('database_connectors.neon', 'NeonConnector'),
+    
+    # Time-series databases
+    'influxdb': ('database_connectors.timeseries', 'InfluxDBConnector'),
+    'timescaledb': ('database_connectors.timescaledb', 'TimescaleDBConnector'),
+    'kdb': ('database_connectors.kdb', 'KdbConnector'),
+    'prometheus': ('database_connectors.timeseries', 'PrometheusConnector')
+}
+
 def _import_connector(module_path, class_name):
     """
     Dynamically import a connector class from a module path
@@ -20,7 +66,7 @@ def _import_connector(module_path, class_name):
         class or None: The connector class or None if import fails
     """
     # Check cache first
-    cache_key = f"{module_path}.{class_name}"
+    cache_key = (module_path, class_name)
     if cache_key in _connector_cache:
         return _connector_cache[cache_key]
     
@@ -30,7 +76,7 @@ def _import_connector(module_path, class_name):
         _connector_cache[cache_key] = connector_class
         return connector_class
     except (ImportError, AttributeError) as e:
-        logger.warning(f"Failed to import {class_name} from {module_path}: {str(e)}")
+        logger.warning("Failed to import %s from %s: %s", class_name, module_path, e)
         return None
 
 def get_connector(db_type, credentials):
@@ -44,55 +90,10 @@ def get_connector(db_type, credentials):
     Returns:
         object: An instance of the appropriate database connector
     """
-    # Define mappings from database type to module path and class name
-    connector_map = {
-        # Relational databases
-        'postgresql': ('database_connectors.relational', 'PostgreSQLConnector'),
-        'mysql': ('database_connectors.relational', 'MySQLConnector'),
-        'sqlserver': ('database_connectors.relational', 'SQLServerConnector'),
-        'oracle': ('database_connectors.relational', 'OracleConnector'),
-        'sqlite': ('database_connectors.relational', 'SQLiteConnector'),
-        'redshift': ('database_connectors.relational', 'RedshiftConnector'),
-        'cloudsql': ('database_connectors.relational', 'CloudSQLConnector'),
-        'mariadb': ('database_connectors.relational', 'MariaDBConnector'),
-        'db2': ('database_connectors.relational', 'DB2Connector'),
-        
-        # NoSQL databases
-        'mongodb': ('database_connectors.nosql', 'MongoDBConnector'),
-        'cassandra': ('database_connectors.nosql', 'CassandraConnector'),
-        'redis': ('database_connectors.nosql', 'RedisConnector'),
-        'elasticsearch': ('database_connectors.nosql', 'ElasticsearchConnector'),
-        'dynamodb': ('database_connectors.nosql', 'DynamoDBConnector'),
-        'couchbase': ('database_connectors.nosql', 'CouchbaseConnector'),
-        
-        # Graph databases
-        'neo4j': ('database_connectors.graph', 'Neo4jConnector'),
-        'tigergraph': ('database_connectors.graph', 'TigerGraphConnector'),
-        
-        # Data warehouse
-        'snowflake': ('database_connectors.datawarehouse', 'SnowflakeConnector'),
-        'bigquery': ('database_connectors.datawarehouse', 'BigQueryConnector'),
-        'synapse': ('database_connectors.datawarehouse', 'SynapseConnector'),
-        
-        # Cloud databases
-        'cosmosdb': ('database_connectors.cloud', 'CosmosDBConnector'),
-        'firestore': ('database_connectors.cloud', 'FirestoreConnector'),
-        'supabase': ('database_connectors.cloud', 'SupabaseConnector'),
-        'heroku': ('database_connectors.heroku', 'HerokuConnector'),
-        'crunchybridge': ('database_connectors.crunchybridge', 'CrunchyBridgeConnector'),
-        'neon': ('database_connectors.neon', 'NeonConnector'),
-        
-        # Time-series databases
-        'influxdb': ('database_connectors.timeseries', 'InfluxDBConnector'),
-        'timescaledb': ('database_connectors.timescaledb', 'TimescaleDBConnector'),
-        'kdb': ('database_connectors.kdb', 'KdbConnector'),
-        'prometheus': ('database_connectors.timeseries', 'PrometheusConnector')
-    }
-    
-    if db_type not in connector_map:
+    if db_type not in _CONNECTOR_MAP:
         raise ValueError(f"Unsupported database type: {db_type}")
     
-    module_path, class_name = connector_map[db_type]
+    module_path, class_name = _CONNECTOR_MAP[db_type]
     connector_class = _import_connector(module_path, class_name)
     
     if connector_class is None:
@@ -116,3 +117,33 @@ def test_connection(db_type, credentials):
         return connector.test_connection()
     except Exception as e:
         return False, f"Error connecting to {db_type}: {str(e)}"
+
+
+def _schema_or_error(connector):
+    """Get a connector's schema, turning an unexpected exception into an error entry"""
+    try:
+        return connector.get_schema()
+    except Exception as e:
+        logger.exception("Error getting schema from %s", type(connector).__name__)
+        return {"error": f"Error getting schema: {str(e)}"}
+
+def get_schema_parallel(connectors):
+    """
+    Get the schemas of several databases at once
+    
+    Each connector reads its schema on its own thread, so the catalog queries
+    of different databases overlap instead of running one after another.
+    
+    Args:
+        connectors (list): Database connectors, e.g. from get_connector()
+        
+    Returns:
+        list: The schema of each connector, in the same order
+    """
+    if len(connectors) < 2:
+        return [_schema_or_error(connector) for connector in connectors]
+    
+    from .relational import SCHEMA_MAX_WORKERS
+    
+    with ThreadPoolExecutor(max_workers=min(SCHEMA_MAX_WORKERS, len(connectors))) as executor:
+        return list(executor.map(_schema_or_error, connectors))
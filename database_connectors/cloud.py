@@ -2,6 +2,8 @@ import logging
 import json
 import os
 
+from utils import json_loads
+
 # Import cloud database libraries with try/except to handle missing dependencies
 try:
     from azure.cosmos import CosmosClient
@@ -23,7 +25,6 @@ except ImportError:
     Client = None
 
 # Configure logging
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 class BaseCloudConnector:
@@ -43,7 +44,7 @@ class BaseCloudConnector:
             try:
                 self.client.close()
             except Exception as e:
-                logger.error(f"Error disconnecting: {str(e)}")
+                logger.error("Error disconnecting: %s", e)
             finally:
                 self.client = None
     
@@ -109,7 +110,7 @@ class CosmosDBConnector(BaseCloudConnector):
             self.connect()
             
             # Parse the query string as JSON
-            query_obj = json.loads(query)
+            query_obj = json_loads(query)
             
             operation = query_obj.get("operation")
             database_id = query_obj.get("database") or self.database_name
@@ -176,7 +177,7 @@ class CosmosDBConnector(BaseCloudConnector):
         except json.JSONDecodeError:
             return None, False, "Invalid JSON query format"
         except Exception as e:
-            logger.exception(f"Error executing Cosmos DB operation: {query}")
+            logger.exception("Error executing Cosmos DB operation: %s", query)
             return None, False, f"Error executing operation: {str(e)}"
         finally:
             self.disconnect()
@@ -219,7 +220,7 @@ class FirestoreConnector(BaseCloudConnector):
                                 
                             firebase_admin.initialize_app(cred, config)
                         except Exception as e:
-                            logger.error(f"Failed to initialize with service account key: {str(e)}")
+                            logger.error("Failed to initialize with service account key: %s", e)
                             raise ValueError(f"Failed to initialize with service account key: {str(e)}")
                     elif project_id:
                         # Try to initialize with just project ID
@@ -254,7 +255,7 @@ class FirestoreConnector(BaseCloudConnector):
             self.connect()
             
             # Parse the query string as JSON
-            query_obj = json.loads(query)
+            query_obj = json_loads(query)
             
             operation = query_obj.get("operation")
             collection = query_obj.get("collection")
@@ -385,7 +386,7 @@ class FirestoreConnector(BaseCloudConnector):
         except json.JSONDecodeError:
             return None, False, "Invalid JSON query format"
         except Exception as e:
-            logger.exception(f"Error executing Firestore operation: {query}")
+            logger.exception("Error executing Firestore operation: %s", query)
             return None, False, f"Error executing operation: {str(e)}"
         finally:
             self.disconnect()
@@ -455,7 +456,7 @@ class SupabaseConnector(BaseCloudConnector):
             self.connect()
             
             # Parse the query string as JSON
-            query_obj = json.loads(query)
+            query_obj = json_loads(query)
             
             operation = query_obj.get("operation")
             table = query_obj.get("table")
@@ -580,7 +581,7 @@ class SupabaseConnector(BaseCloudConnector):
         except json.JSONDecodeError:
             return None, False, "Invalid JSON query format"
         except Exception as e:
-            logger.exception(f"Error executing Supabase operation: {query}")
+            logger.exception("Error executing Supabase operation: %s", query)
             return None, False, f"Error executing operation: {str(e)}"
         finally:
             self.disconnect()
@@ -2,8 +2,9 @@ import logging
 import os
 import re
 
+from .relational import FETCH_CHUNK_SIZE
+
 # Configure logging
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 class CrunchyBridgeConnector:
@@ -69,7 +70,7 @@ class CrunchyBridgeConnector:
             try:
                 self.connection.close()
             except Exception as e:
-                logger.error(f"Error disconnecting from Crunchy Bridge PostgreSQL: {str(e)}")
+                logger.error("Error disconnecting from Crunchy Bridge PostgreSQL: %s", e)
             finally:
                 self.connection = None
     
@@ -151,11 +152,13 @@ class CrunchyBridgeConnector:
                 columns = [desc[0] for desc in cursor.description]
                 results = []
                 
-                for row in cursor.fetchall():
-                    result_dict = {}
-                    for i, col in enumerate(columns):
-                        result_dict[col] = row[i]
-                    results.append(result_dict)
+                # Read in chunks so the driver's row tuples are released as
+                # each chunk is converted
+                while True:
+                    rows = cursor.fetchmany(FETCH_CHUNK_SIZE)
+                    if not rows:
+                        break
+                    results.extend(dict(zip(columns, row)) for row in rows)
                 
                 cursor.close()
                 return results, True, None
@@ -168,7 +171,7 @@ class CrunchyBridgeConnector:
                 return {"affected_rows": affected_rows}, True, None
             
         except Exception as e:
-            logger.exception(f"Error executing Crunchy Bridge PostgreSQL query: {query}")
+            logger.exception("Error executing Crunchy Bridge PostgreSQL query: %s", query)
             return None, False, f"Error executing query: {str(e)}"
         finally:
             self.disconnect()
\ No newline at end of file
@@ -4,8 +4,9 @@ import snowflake.connector
 from google.cloud import bigquery
 import pyodbc
 
+from .relational import FETCH_CHUNK_SIZE
+
 # Configure logging
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 class BaseDataWarehouseConnector:
@@ -25,7 +26,7 @@ class BaseDataWarehouseConnector:
             try:
                 self.client.close()
             except Exception as e:
-                logger.error(f"Error disconnecting: {str(e)}")
+                logger.error("Error disconnecting: %s", e)
             finally:
                 self.client = None
     
@@ -163,8 +164,13 @@ class SnowflakeConnector(BaseDataWarehouseConnector):
                 columns = [col[0] for col in cursor.description]
                 results = []
                 
-                for row in cursor.fetchall():
-                    results.append(dict(zip(columns, row)))
+                # Read in chunks so the driver's row tuples are released as
+                # each chunk is converted
+                while True:
+                    rows = cursor.fetchmany(FETCH_CHUNK_SIZE)
+                    if not rows:
+                        break
+                    results.extend(dict(zip(columns, row)) for row in rows)
                 
                 return results, True, None
             else:
@@ -173,7 +179,7 @@ class SnowflakeConnector(BaseDataWarehouseConnector):
                 return {"affected_rows": cursor.rowcount}, True, None
             
         except Exception as e:
-            logger.exception(f"Error executing Snowflake query: {query}")
+            logger.exception("Error executing Snowflake query: %s", query)
             return None, False, f"Error executing query: {str(e)}"
         finally:
             self.disconnect()
@@ -264,7 +270,7 @@ class BigQueryConnector(BaseDataWarehouseConnector):
             return results, True, None
             
         except Exception as e:
-            logger.exception(f"Error executing BigQuery query: {query}")
+            logger.exception("Error executing BigQuery query: %s", query)
             return None, False, f"Error executing query: {str(e)}"
         finally:
             self.disconnect()
@@ -373,8 +379,13 @@ class SynapseConnector(BaseDataWarehouseConnector):
                 columns = [col[0] for col in cursor.description]
                 results = []
                 
-                for row in cursor.fetchall():
-                    results.append(dict(zip(columns, row)))
+                # Read in chunks so the driver's row tuples are released as
+                # each chunk is converted
+                while True:
+                    rows = cursor.fetchmany(FETCH_CHUNK_SIZE)
+                    if not rows:
+                        break
+                    results.extend(dict(zip(columns, row)) for row in rows)
                 
                 return results, True, None
             else:
@@ -383,7 +394,7 @@ class SynapseConnector(BaseDataWarehouseConnector):
                 return {"affected_rows": cursor.rowcount}, True, None
             
         except Exception as e:
-            logger.exception(f"Error executing Azure Synapse Analytics query: {query}")
+            logger.exception("Error executing Azure Synapse Analytics query: %s", query)
             return None, False, f"Error executing query: {str(e)}"
         finally:
             self.disconnect()
@@ -1,13 +1,60 @@
 import logging
 import json
 import os
+import re
 import requests
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
 from urllib.parse import urljoin
 
+from utils import json_loads
+
 # Configure logging
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
+# Matches a literal compared against with a comparison operator, or any quoted
+# string/identifier so literals inside them are skipped
+_CYPHER_LITERAL = re.compile(
+    r"""(?P<op><>|<=|>=|=|<|>)(?P<space>\s*)"""
+    r"""(?P<literal>'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*"|-?\d+(?:\.\d+)?)(?![\w.])"""
+    r"""|(?P<quoted>'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*"|`[^`]*`)"""
+)
+
+@lru_cache(maxsize=256)
+def _parameterize_cypher(cypher):
+    """
+    Replace compared literals in a Cypher query with parameters
+    
+    Queries that only differ in their literal values then share the same text,
+    so Neo4j can reuse its cached execution plan for them.
+    
+    Args:
+        cypher (str): The Cypher query
+        
+    Returns:
+        tuple: (template, params) where params is a tuple of (name, value) pairs
+    """
+    params = []
+    
+    def replace(match):
+        if match.group("quoted"):
+            return match.group(0)
+        name = f"_lit{len(params)}"
+        literal = match.group("literal")
+        if literal[0] in "'\"":
+            value = literal[1:-1].encode("latin-1", "backslashreplace").decode("unicode_escape")
+        elif "." in literal:
+            value = float(literal)
+        else:
+            value = int(literal)
+        params.append((name, value))
+        return f"{match.group('op')}{match.group('space')}${name}"
+    
+    template = _CYPHER_LITERAL.sub(replace, cypher)
+    return template, tuple(params)
+
 class BaseGraphConnector:
     """Base class for graph database connectors"""
     
@@ -168,7 +215,7 @@ class TigerGraphConnector(BaseGraphConnector):
             
             # Check if the query is a JSON string
             try:
-                query_json = json.loads(query)
+                query_json = json_loads(query)
                 
                 # Determine the operation type
                 operation = query_json.get("operation", "").lower()
@@ -234,20 +281,55 @@ class TigerGraphConnector(BaseGraphConnector):
                 return result, True, None
                 
         except Exception as e:
-            logger.exception(f"Error executing TigerGraph query: {query}")
+            logger.exception("Error executing TigerGraph query: %s", query)
             return None, False, f"Error executing query: {str(e)}"
         finally:
             self.disconnect()
 
+@dataclass(frozen=True, slots=True)
+class Neo4jCredentials:
+    """Neo4j connection settings, resolved once per connector"""
+    uri: Optional[str]
+    username: Optional[str]
+    password: Optional[str]
+    database: Optional[str]
+    
+    # Environment variables read when no URI is submitted with the credentials
+    ENV_FALLBACKS = (
+        ("uri", "NEO4J_URI"),
+        ("username", "NEO4J_USERNAME"),
+        ("password", "NEO4J_PASSWORD"),
+        ("database", "NEO4J_DATABASE"),
+    )
+    
+    @classmethod
+    def from_credentials(cls, credentials):
+        """
+        Build the settings from a credentials dict, falling back to environment variables
+        
+        The fallback is all or nothing: the environment is only read when no
+        URI was submitted, so the server's login is never sent to a host the
+        user chose.
+        
+        Args:
+            credentials (dict): The credentials submitted for the connection
+            
+        Returns:
+            Neo4jCredentials: The resolved settings
+        """
+        if credentials.get("uri"):
+            return cls(**{field: credentials.get(field) for field, _ in cls.ENV_FALLBACKS})
+        
+        logger.info("Using Neo4j connection settings from environment variables")
+        return cls(**{field: os.environ.get(env_var) for field, env_var in cls.ENV_FALLBACKS})
+
 class Neo4jConnector(BaseGraphConnector):
     """Connector for Neo4j databases"""
     
     def __init__(self, credentials):
         super().__init__(credentials)
-        self.uri = self.credentials.get("uri")
-        self.username = self.credentials.get("username")
-        self.password = self.credentials.get("password")
-        self.database = self.credentials.get("database")
+        self.creds = Neo4jCredentials.from_credentials(self.credentials)
+        self.driver = None
     
     def connect(self):
         """Connect to a Neo4j database"""
@@ -259,19 +341,19 @@ class Neo4jConnector(BaseGraphConnector):
                 raise ImportError("neo4j package is required to connect to Neo4j")
             
             # Validate required credentials
-            if not self.uri:
+            if not self.creds.uri:
                 raise ValueError("Neo4j URI is required")
-            if not self.username or not self.password:
+            if not self.creds.username or not self.creds.password:
                 raise ValueError("Neo4j username and password are required")
             
             # Initialize connection
             self.driver = neo4j.GraphDatabase.driver(
-                self.uri, 
-                auth=(self.username, self.password)
+                self.creds.uri, 
+                auth=(self.creds.username, self.creds.password)
             )
             
             # Test connection
-            with self.driver.session(database=self.database) as session:
+            with self.driver.session(database=self.creds.database) as session:
                 session.run("RETURN 1")
                 
         except Exception as e:
@@ -293,35 +375,24 @@ class Neo4jConnector(BaseGraphConnector):
             if not self.driver:
                 return {"error": "Not connected to Neo4j"}
             
-            schema_info = {
-                "nodes": {},
-                "relationships": {}
-            }
-            
-            with self.driver.session(database=self.database) as session:
-                # Get node labels
-                result = session.run("""
+            # Fetch node and relationship types concurrently. The driver is
+            # thread-safe but sessions are not, so each worker opens its own.
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                nodes = executor.submit(self._fetch_schema_types, """
                     CALL db.schema.nodeTypeProperties()
                     YIELD nodeType, propertyName, propertyTypes
                     RETURN nodeType, collect({name: propertyName, types: propertyTypes}) as properties
-                """)
-                
-                for record in result:
-                    node_type = record["nodeType"]
-                    properties = record["properties"]
-                    schema_info["nodes"][node_type] = properties
-                
-                # Get relationship types
-                result = session.run("""
+                """, "nodeType")
+                relationships = executor.submit(self._fetch_schema_types, """
                     CALL db.schema.relTypeProperties()
                     YIELD relType, propertyName, propertyTypes
                     RETURN relType, collect({name: propertyName, types: propertyTypes}) as properties
-                """)
+                """, "relType")
                 
-                for record in result:
-                    rel_type = record["relType"]
-                    properties = record["properties"]
-                    schema_info["relationships"][rel_type] = properties
+                schema_info = {
+                    "nodes": nodes.result(),
+                    "relationships": relationships.result()
+                }
             
             return schema_info
             
@@ -331,8 +402,22 @@ class Neo4jConnector(BaseGraphConnector):
         finally:
             self.disconnect()
     
+    def _fetch_schema_types(self, cypher, type_key):
+        """
+        Run a schema procedure query in its own session
+        
+        Args:
+            cypher (str): The schema query to run
+            type_key (str): The column holding the node or relationship type
+            
+        Returns:
+            dict: Mapping of type to its properties
+        """
+        with self.driver.session(database=self.creds.database) as session:
+            return {record[type_key]: record["properties"] for record in session.run(cypher)}
+    
     def _neo4j_to_dict(self, value):
-        """Convert Neo4j objects to dictionaries"""
+        """Convert Neo4j objects to dictionaries (used for verbose query results)"""
         if hasattr(value, "keys") and callable(value.keys):
             return {k: self._neo4j_to_dict(value[k]) for k in value.keys()}
         elif hasattr(value, "__iter__") and not isinstance(value, (str, bytes, bytearray)):
@@ -345,7 +430,9 @@ class Neo4jConnector(BaseGraphConnector):
         Execute a Cypher query against Neo4j
         
         Args:
-            query (str): A Cypher query string or JSON representing a query with parameters
+            query (str): A Cypher query string or JSON representing a query with parameters.
+                Set "verbose" in the JSON form to walk every returned value with
+                _neo4j_to_dict instead of using the driver's own conversion.
             
         Returns:
             tuple: (result, success, error_message)
@@ -358,9 +445,10 @@ class Neo4jConnector(BaseGraphConnector):
             
             # Check if the query is a JSON string
             try:
-                query_json = json.loads(query)
+                query_json = json_loads(query)
                 cypher = query_json.get("cypher")
                 params = query_json.get("params", {})
+                verbose = bool(query_json.get("verbose", False))
                 
                 if not cypher:
                     return None, False, "Cypher query is required"
@@ -369,14 +457,23 @@ class Neo4jConnector(BaseGraphConnector):
                 # If it's not a JSON string, assume it's a Cypher query
                 cypher = query
                 params = {}
+                verbose = False
             
-            with self.driver.session(database=self.database) as session:
+            # Parameterize literals so repeated queries hit the server's plan cache
+            cypher, literal_params = _parameterize_cypher(cypher)
+            params = {**dict(literal_params), **params}
+            
+            with self.driver.session(database=self.creds.database) as session:
                 result = session.run(cypher, params)
-                records = [self._neo4j_to_dict(record) for record in result]
+                if verbose:
+                    records = [self._neo4j_to_dict(record) for record in result]
+                else:
+                    # Let the driver flatten nodes, relationships and paths itself
+                    records = result.data()
                 return records, True, None
                 
         except Exception as e:
-            logger.exception(f"Error executing Neo4j query: {query}")
+            logger.exception("Error executing Neo4j query: %s", query)
             return None, False, f"Error executing query: {str(e)}"
         finally:
             self.disconnect()
\ No newline at end of file
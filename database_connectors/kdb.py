@@ -12,7 +12,6 @@ except ImportError:
     qconnection = None
 
 # Configure logging
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 class KdbConnector:
@@ -57,7 +56,7 @@ class KdbConnector:
             try:
                 self.client.close()
             except Exception as e:
-                logger.error(f"Error disconnecting from Kdb+: {str(e)}")
+                logger.error("Error disconnecting from Kdb+: %s", e)
             finally:
                 self.client = None
     
@@ -141,7 +140,7 @@ class KdbConnector:
             return result, True, None
                 
         except Exception as e:
-            logger.exception(f"Error executing Kdb+ query: {query}")
+            logger.exception("Error executing Kdb+ query: %s", query)
             return None, False, f"Error executing query: {str(e)}"
         finally:
             self.disconnect()
@@ -1,5 +1,10 @@
+import hashlib
 import logging
 import json
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from utils import json_loads
 
 # Import NoSQL libraries with try/except to handle missing dependencies
 try:
@@ -26,8 +31,10 @@ except ImportError:
 
 try:
     import boto3
+    from botocore.config import Config as BotoConfig
 except ImportError:
     boto3 = None
+    BotoConfig = None
 
 try:
     from couchbase.cluster import Cluster as CouchbaseCluster
@@ -42,9 +49,63 @@ except ImportError:
     GraphDatabase = None
 
 # Configure logging
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
+# Upper bound on concurrent DescribeTable calls during DynamoDB schema discovery
+_SCHEMA_MAX_WORKERS = 32
+
+# boto3 sessions keyed by (credentials fingerprint, region). A session caches
+# the loaded service models, so resources built from it skip reloading them.
+# Sessions aren't thread-safe, so they are only used under the lock.
+_dynamodb_session_cache = {}
+_dynamodb_session_lock = threading.Lock()
+
+def _new_dynamodb_resource(access_key, secret_key, region):
+    """
+    Build a DynamoDB resource from the shared session for a set of credentials
+    
+    Resources aren't thread-safe, so each connector gets its own.
+    
+    Args:
+        access_key (str): The AWS access key ID
+        secret_key (str): The AWS secret access key
+        region (str): The AWS region
+        
+    Returns:
+        object: A boto3 DynamoDB service resource
+    """
+    fingerprint = hashlib.sha256(f"{access_key}:{secret_key}".encode("utf-8")).hexdigest()
+    cache_key = (fingerprint, region)
+    
+    with _dynamodb_session_lock:
+        session = _dynamodb_session_cache.get(cache_key)
+        if session is None:
+            session = boto3.session.Session(
+                aws_access_key_id=access_key,
+                aws_secret_access_key=secret_key,
+                region_name=region
+            )
+            _dynamodb_session_cache[cache_key] = session
+        
+        # Size the HTTP pool to match the schema discovery fan-out
+        return session.resource(
+            'dynamodb',
+            config=BotoConfig(max_pool_connections=_SCHEMA_MAX_WORKERS, tcp_keepalive=True)
+        )
+
+# Whitelist of optional read parameters forwarded to DynamoDB scan/query calls,
+# mapped from the snake_case keys used in query JSON to the boto3 keyword names
+_DYNAMODB_READ_OPTIONS = {
+    "limit": "Limit",
+    "scan_index_forward": "ScanIndexForward",
+    "index_name": "IndexName",
+    "filter_expression": "FilterExpression",
+    "projection_expression": "ProjectionExpression",
+    "expression_attribute_names": "ExpressionAttributeNames",
+    "expression_attribute_values": "ExpressionAttributeValues",
+    "exclusive_start_key": "ExclusiveStartKey",
+}
+
 class BaseNoSQLConnector:
     """Base class for NoSQL database connectors"""
     
@@ -62,7 +123,7 @@ class BaseNoSQLConnector:
             try:
                 self.client.close()
             except Exception as e:
-                logger.error(f"Error disconnecting: {str(e)}")
+                logger.error("Error disconnecting: %s", e)
             finally:
                 self.client = None
     
@@ -186,7 +247,7 @@ class MongoDBConnector(BaseNoSQLConnector):
             self.connect()
             
             # Parse the query string as JSON
-            query_obj = json.loads(query)
+            query_obj = json_loads(query)
             
             db_name = query_obj.get("database")
             collection_name = query_obj.get("collection")
@@ -239,7 +300,7 @@ class MongoDBConnector(BaseNoSQLConnector):
         except json.JSONDecodeError:
             return None, False, "Invalid JSON query format"
         except Exception as e:
-            logger.exception(f"Error executing MongoDB query: {query}")
+            logger.exception("Error executing MongoDB query: %s", query)
             return None, False, f"Error executing query: {str(e)}"
         finally:
             self.disconnect()
@@ -273,7 +334,7 @@ class CassandraConnector(BaseNoSQLConnector):
             try:
                 self.client.shutdown()
             except Exception as e:
-                logger.error(f"Error disconnecting from Cassandra: {str(e)}")
+                logger.error("Error disconnecting from Cassandra: %s", e)
             finally:
                 self.client = None
     
@@ -365,7 +426,7 @@ class CassandraConnector(BaseNoSQLConnector):
             return rows, True, None
             
         except Exception as e:
-            logger.exception(f"Error executing CQL query: {query}")
+            logger.exception("Error executing CQL query: %s", query)
             return None, False, f"Error executing query: {str(e)}"
         finally:
             self.disconnect()
@@ -409,7 +470,7 @@ class RedisConnector(BaseNoSQLConnector):
             self.connect()
             
             # Parse the query string as JSON
-            query_obj = json.loads(query)
+            query_obj = json_loads(query)
             
             command = query_obj.get("command")
             args = query_obj.get("args", [])
@@ -429,7 +490,7 @@ class RedisConnector(BaseNoSQLConnector):
         except json.JSONDecodeError:
             return None, False, "Invalid JSON query format"
         except Exception as e:
-            logger.exception(f"Error executing Redis command: {query}")
+            logger.exception("Error executing Redis command: %s", query)
             return None, False, f"Error executing command: {str(e)}"
         finally:
             self.disconnect()
@@ -506,7 +567,7 @@ class ElasticsearchConnector(BaseNoSQLConnector):
             self.connect()
             
             # Parse the query string as JSON
-            query_obj = json.loads(query)
+            query_obj = json_loads(query)
             
             operation = query_obj.get("operation")
             index = query_obj.get("index")
@@ -563,13 +624,32 @@ class ElasticsearchConnector(BaseNoSQLConnector):
         except json.JSONDecodeError:
             return None, False, "Invalid JSON query format"
         except Exception as e:
-            logger.exception(f"Error executing Elasticsearch query: {query}")
+            logger.exception("Error executing Elasticsearch query: %s", query)
             return None, False, f"Error executing query: {str(e)}"
         finally:
             self.disconnect()
 
 class DynamoDBConnector(BaseNoSQLConnector):
-    """Connector for Amazon DynamoDB databases"""
+    """
+    Connector for Amazon DynamoDB databases
+    
+    boto3 sessions are shared across connectors with the same credentials and
+    region. Call DynamoDBConnector.invalidate_cache() after rotating credentials.
+    
+    Scans and queries always return a list of items. When DynamoDB stops before
+    the end of the table, last_evaluated_key holds the key to pass back as
+    exclusive_start_key for the next page.
+    """
+    
+    def __init__(self, credentials):
+        super().__init__(credentials)
+        self.last_evaluated_key = None
+    
+    @staticmethod
+    def invalidate_cache():
+        """Drop all cached boto3 sessions so the next connect builds fresh ones"""
+        with _dynamodb_session_lock:
+            _dynamodb_session_cache.clear()
     
     def connect(self):
         """Connect to an Amazon DynamoDB database"""
@@ -579,12 +659,7 @@ class DynamoDBConnector(BaseNoSQLConnector):
                 secret_key = self.credentials.get("secret_key")
                 region = self.credentials.get("region", "us-east-1")
                 
-                self.client = boto3.resource(
-                    'dynamodb',
-                    aws_access_key_id=access_key,
-                    aws_secret_access_key=secret_key,
-                    region_name=region
-                )
+                self.client = _new_dynamodb_resource(access_key, secret_key, region)
                 
                 # Test connection by listing tables
                 self.client.tables.all()
@@ -593,6 +668,10 @@ class DynamoDBConnector(BaseNoSQLConnector):
                 logger.exception("Error connecting to DynamoDB")
                 raise Exception(f"Error connecting to DynamoDB: {str(e)}")
     
+    def disconnect(self):
+        """Release the DynamoDB resource"""
+        self.client = None
+    
     def get_schema(self):
         """Get the tables and their schemas in the DynamoDB database"""
         try:
@@ -602,12 +681,28 @@ class DynamoDBConnector(BaseNoSQLConnector):
                 "tables": []
             }
             
-            # Get all tables
-            for table in self.client.tables.all():
+            table_names = [table.name for table in self.client.tables.all()]
+            if not table_names:
+                return schema_info
+            
+            # Describe tables concurrently; the low-level client is thread-safe
+            # unlike the resource, and boto3 releases the GIL during network I/O
+            dynamodb = self.client.meta.client
+            descriptions = {}
+            max_workers = min(_SCHEMA_MAX_WORKERS, len(table_names))
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = {
+                    executor.submit(dynamodb.describe_table, TableName=name): name
+                    for name in table_names
+                }
+                for future in as_completed(futures):
+                    descriptions[futures[future]] = future.result()["Table"]
+            
+            for name in table_names:
                 table_info = {
-                    "name": table.name,
-                    "key_schema": table.key_schema,
-                    "attribute_definitions": table.attribute_definitions
+                    "name": name,
+                    "key_schema": descriptions[name].get("KeySchema"),
+                    "attribute_definitions": descriptions[name].get("AttributeDefinitions")
                 }
                 
                 schema_info["tables"].append(table_info)
@@ -620,6 +715,34 @@ class DynamoDBConnector(BaseNoSQLConnector):
         finally:
             self.disconnect()
     
+    def _read_options(self, query_obj):
+        """
+        Collect the optional scan/query parameters present in a query object
+        
+        Only keys listed in _DYNAMODB_READ_OPTIONS are forwarded, so arbitrary
+        keyword arguments can't be injected into the boto3 call.
+        
+        Args:
+            query_obj (dict): The parsed query JSON
+            
+        Returns:
+            dict: boto3 keyword arguments
+        """
+        kwargs = {}
+        for key, param in _DYNAMODB_READ_OPTIONS.items():
+            value = query_obj.get(key)
+            if value is not None:
+                kwargs[param] = value
+        return kwargs
+    
+    def _paginated_items(self, result):
+        """
+        Return the items of a scan/query response, keeping the key to resume
+        from in last_evaluated_key when DynamoDB stopped before the end of the table
+        """
+        self.last_evaluated_key = result.get("LastEvaluatedKey")
+        return result["Items"]
+    
     def execute_query(self, query):
         """
         Execute a DynamoDB query
@@ -630,11 +753,12 @@ class DynamoDBConnector(BaseNoSQLConnector):
         Returns:
             tuple: (result, success, error_message)
         """
+        self.last_evaluated_key = None
         try:
             self.connect()
             
             # Parse the query string as JSON
-            query_obj = json.loads(query)
+            query_obj = json_loads(query)
             
             operation = query_obj.get("operation")
             table_name = query_obj.get("table")
@@ -645,17 +769,20 @@ class DynamoDBConnector(BaseNoSQLConnector):
             table = self.client.Table(table_name)
             
             if operation == "scan":
-                filter_expression = query_obj.get("filter_expression")
                 attrs_to_get = query_obj.get("attributes_to_get")
                 
-                kwargs = {}
-                if filter_expression:
-                    kwargs["FilterExpression"] = filter_expression
-                if attrs_to_get:
-                    kwargs["ProjectionExpression"] = ", ".join(attrs_to_get)
+                kwargs = self._read_options(query_obj)
+                if attrs_to_get and "ProjectionExpression" not in kwargs:
+                    # Alias attribute names so reserved words like Name or Status work
+                    placeholders = tuple(f"#a{i}" for i in range(len(attrs_to_get)))
+                    kwargs["ProjectionExpression"] = ", ".join(placeholders)
+                    kwargs["ExpressionAttributeNames"] = {
+                        **dict(zip(placeholders, attrs_to_get)),
+                        **kwargs.get("ExpressionAttributeNames", {})
+                    }
                 
                 result = table.scan(**kwargs)
-                return result["Items"], True, None
+                return self._paginated_items(result), True, None
                 
             elif operation == "query":
                 key_condition = query_obj.get("key_condition")
@@ -663,8 +790,9 @@ class DynamoDBConnector(BaseNoSQLConnector):
                 if not key_condition:
                     return None, False, "Query operation requires key condition"
                 
-                result = table.query(KeyConditionExpression=key_condition)
-                return result["Items"], True, None
+                kwargs = self._read_options(query_obj)
+                result = table.query(KeyConditionExpression=key_condition, **kwargs)
+                return self._paginated_items(result), True, None
                 
             elif operation == "get_item":
                 key = query_obj.get("key")
@@ -712,7 +840,7 @@ class DynamoDBConnector(BaseNoSQLConnector):
         except json.JSONDecodeError:
             return None, False, "Invalid JSON query format"
         except Exception as e:
-            logger.exception(f"Error executing DynamoDB operation: {query}")
+            logger.exception("Error executing DynamoDB operation: %s", query)
             return None, False, f"Error executing operation: {str(e)}"
         finally:
             self.disconnect()
@@ -768,7 +896,7 @@ class CouchbaseConnector(BaseNoSQLConnector):
             return rows, True, None
             
         except Exception as e:
-            logger.exception(f"Error executing Couchbase query: {query}")
+            logger.exception("Error executing Couchbase query: %s", query)
             return None, False, f"Error executing query: {str(e)}"
         finally:
             self.disconnect()
@@ -846,7 +974,7 @@ class Neo4jConnector(BaseNoSQLConnector):
                 return records, True, None
             
         except Exception as e:
-            logger.exception(f"Error executing Cypher query: {query}")
+            logger.exception("Error executing Cypher query: %s", query)
             return None, False, f"Error executing query: {str(e)}"
         finally:
             self.disconnect()
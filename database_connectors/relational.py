@@ -1,138 +1,879 @@
+import asyncio
+import copy
+import hashlib
+import io
 import logging
 import json
 import os
+import re
 import sqlite3
+import threading
+import time
+import uuid
+import weakref
+from collections import namedtuple
+from functools import lru_cache
+from itertools import groupby
+from operator import itemgetter
+from urllib.parse import quote_plus
 
-# Import database libraries with try/except to handle missing dependencies
-try:
-    import psycopg2
-except ImportError:
-    psycopg2 = None
+from utils import json_dumps_bytes
 
-try:
-    import mysql.connector
-except ImportError:
-    mysql = type('mysql', (), {'connector': None})
-
-try:
-    import pyodbc
-except ImportError:
-    pyodbc = None
-
-try:
-    import cx_Oracle
-except ImportError:
-    cx_Oracle = None
-
-try:
-    import boto3
-except ImportError:
-    boto3 = None
-
-try:
-    import sqlalchemy
-    from sqlalchemy import create_engine, inspect
-except ImportError:
-    sqlalchemy = None
-
-try:
-    import ibm_db
-except ImportError:
-    ibm_db = None
+# Database drivers and SQLAlchemy are imported where they are first used, so a
+# process only pays the import cost of the databases it actually connects to
 
 # Configure logging
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
+# Maximum number of connections each shared pool keeps open
+POOL_MAX_CONNECTIONS = 10
+
+# Connections one database may have checked out at once across all connectors;
+# further calls wait for a slot instead of exhausting the pool or the server
+MAX_CONCURRENT_PER_DB = int(os.environ.get("SPEAKDB_MAX_CONCURRENT_PER_DB", POOL_MAX_CONNECTIONS))
+
+# Seconds a call waits for a free slot before failing
+QUERY_SLOT_TIMEOUT = 30
+
+# Seconds after which an engine replaces a pooled connection, staying under
+# typical server and load balancer idle timeouts
+ENGINE_POOL_RECYCLE = 1800
+
+# Number of rows pulled from the driver per fetchmany() call
+FETCH_CHUNK_SIZE = 1000
+
+# Threads reading schemas in parallel; kept below POOL_MAX_CONNECTIONS
+# so every worker can check out a connection without waiting
+SCHEMA_MAX_WORKERS = 8
+
+# Seconds a fetched schema is served from the cache before it is read again
+SCHEMA_CACHE_TTL = 300
+
+# Seconds a get_schema() call waits for a concurrent read of the same schema
+# before reading it itself
+SCHEMA_WAIT_TIMEOUT = 30
+
+# Number of prepared statements each connection keeps for reuse by drivers
+# with a client-side statement cache
+STATEMENT_CACHE_SIZE = 128
+
+# Largest LIMIT a PostgreSQL query may have to run as a prepared statement.
+# EXECUTE can't stream through a named cursor, so its rows are buffered
+# client-side and only small results are worth preparing
+PREPARED_MAX_ROWS = FETCH_CHUNK_SIZE
+
+# Matches an INSERT whose VALUES clause is a single %s placeholder, the form
+# psycopg2.extras.execute_values expands into one multi-row statement
+_VALUES_PLACEHOLDER = re.compile(r"\bVALUES\s*%s", re.IGNORECASE)
+
+# Leading keywords of statements that return rows. A WITH statement is
+# classified by the statement following its CTE list, see _leading_keyword()
+_RESULT_KEYWORDS = frozenset(("select", "values", "show", "explain", "pragma", "describe", "desc"))
+
+# Row-returning statements that can also be declared as a server-side cursor
+_CURSOR_KEYWORDS = frozenset(("select", "values"))
+
+# Leading keywords of statements that change the schema, so the cached copy is dropped
+_DDL_KEYWORDS = frozenset(("create", "alter", "drop", "rename"))
+
+_KEYWORD = re.compile(r"[A-Za-z]+")
+
+# Tokens of a CTE list: quoted strings and identifiers and comments (skipped
+# whole), parentheses (tracked for nesting) and bare words
+_CTE_TOKEN = re.compile(
+    r"'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"|`[^`]*`|--[^\n]*|/\*.*?\*/|[()]|[A-Za-z_]+",
+    re.DOTALL
+)
+
+# Statements that can follow a WITH clause's CTE list
+_CTE_STATEMENT_KEYWORDS = frozenset(("select", "insert", "update", "delete", "merge", "values", "table"))
+
+# Matches the trailing LIMIT of a statement, which always applies to the top-level query
+_TRAILING_LIMIT = re.compile(r"\bLIMIT\s+(\d+)(?:\s+OFFSET\s+\d+)?$", re.IGNORECASE)
+
+# Matches a statement that starts with a bare SELECT *; WITH ... SELECT * and
+# qualified t.* projections are not matched
+_SELECT_STAR = re.compile(r"^(\s*SELECT\s+(?:DISTINCT\s+)?)\*(?=\s+FROM\b)", re.IGNORECASE)
+
+# Credential fields shared by connectors that log in to a host with a
+# database name, accepting both the old and new form field names
+_HOST_CREDENTIAL_FIELDS = {
+    "host": (("host", "hostname"), "localhost"),
+    "db_name": (("database_name", "db_name"), None),
+    "username": (("username",), None),
+    "password": (("password",), None),
+}
+
+# Catalog query returning (table, column, type, nullable) for every base table
+# in the current schema, ordered so rows for the same table are adjacent
+_INFORMATION_SCHEMA_SQL = """
+    SELECT c.table_name, c.column_name, c.data_type,
+           CASE WHEN c.is_nullable = 'YES' THEN 1 ELSE 0 END
+    FROM information_schema.columns c
+    JOIN information_schema.tables t
+      ON t.table_schema = c.table_schema AND t.table_name = c.table_name
+    WHERE c.table_schema = {schema} AND t.table_type = 'BASE TABLE'
+    ORDER BY c.table_name, c.ordinal_position
+"""
+
+# Connection pools shared by all connectors with the same class and credentials
+_connection_pools = {}
+_connection_pools_lock = threading.Lock()
+
+# Semaphores limiting concurrent checkouts, keyed like the connection pools
+_query_slots = {}
+_query_slots_lock = threading.Lock()
+
+# Schemas keyed like the connection pools, as (fetched_at, schema_info)
+_schema_cache = {}
+_schema_cache_lock = threading.Lock()
+
+# Schema reads in progress, keyed like the cache, as (done_event, [schema_info])
+# so concurrent callers share one catalog scan
+_schema_reads = {}
+
+# Server-side prepared statements per pooled PostgreSQL connection, as
+# [generation, {name: prepared}]. Prepared statements belong to the session, so
+# each connection tracks its own; refresh_schema() bumps the generation so the
+# plans are deallocated after DDL.
+_prepared_statements = weakref.WeakKeyDictionary()
+_prepared_statements_lock = threading.Lock()
+_prepared_generation = 0
+
+def _acquire_query_slot(key):
+    """
+    Wait for one of the MAX_CONCURRENT_PER_DB slots of a database
+    
+    Args:
+        key (tuple): The connector's pool key
+        
+    Returns:
+        threading.BoundedSemaphore: The semaphore to release when the connection is handed back
+    """
+    with _query_slots_lock:
+        slot = _query_slots.get(key)
+        if slot is None:
+            slot = threading.BoundedSemaphore(MAX_CONCURRENT_PER_DB)
+            _query_slots[key] = slot
+    
+    if not slot.acquire(timeout=QUERY_SLOT_TIMEOUT):
+        raise Exception(f"Timed out waiting for a free connection after {QUERY_SLOT_TIMEOUT} seconds")
+    return slot
+
+def _psycopg2_pool_key(args, kwargs):
+    """
+    Build the pool key for a set of psycopg2 connect arguments
+    
+    PostgreSQL, Redshift and TimescaleDB connectors pointed at the same DSN get
+    the same key, so they share one ThreadedConnectionPool and one set of slots.
+    
+    Args:
+        args (tuple): Positional connect arguments, i.e. a DSN
+        kwargs (dict): Keyword connect arguments
+        
+    Returns:
+        tuple: The key into _connection_pools and _query_slots
+    """
+    return ("psycopg2", args, tuple(sorted((k, str(v)) for k, v in kwargs.items())))
+
+def _as_text(value):
+    """Decode catalog values some drivers return as bytes"""
+    if isinstance(value, (bytes, bytearray)):
+        return value.decode("utf-8")
+    return str(value)
+
+def _split_sqlite_statements(query):
+    """
+    Split a SQLite script into complete statements
+    
+    Semicolons inside string literals or trigger bodies don't end a statement;
+    sqlite3.complete_statement decides where each one actually ends.
+    
+    Args:
+        query (str): One or more SQL statements
+        
+    Returns:
+        list: The statements, each with its terminating semicolon
+    """
+    statements = []
+    buffer = ""
+    for piece in query.split(";"):
+        buffer += piece + ";"
+        if sqlite3.complete_statement(buffer):
+            statement = buffer.strip()
+            if statement.rstrip(";").strip():
+                statements.append(statement)
+            buffer = ""
+    
+    if buffer.rstrip(";").strip():
+        statements.append(buffer.strip())
+    return statements
+
+def _leading_keyword(query):
+    """
+    Find the first keyword of a statement without copying the query
+    
+    Skips whitespace, opening parentheses, -- line comments and /* */ block
+    comments, so commented or parenthesized queries are classified correctly.
+    For a WITH statement the keyword of the statement after the CTE list is
+    returned, so WITH ... INSERT is treated as an INSERT rather than a SELECT.
+    
+    Args:
+        query (str): A single SQL statement
+        
+    Returns:
+        str: The lowercased first keyword, or "" if there is none
+    """
+    pos = 0
+    length = len(query)
+    while pos < length:
+        if query[pos].isspace() or query[pos] == "(":
+            pos += 1
+        elif query.startswith("--", pos):
+            end = query.find("\n", pos)
+            pos = length if end == -1 else end + 1
+        elif query.startswith("/*", pos):
+            end = query.find("*/", pos + 2)
+            pos = length if end == -1 else end + 2
+        else:
+            break
+    
+    match = _KEYWORD.match(query, pos)
+    if not match:
+        return ""
+    
+    keyword = match.group().lower()
+    if keyword != "with":
+        return keyword
+    
+    # The main statement is the first statement keyword outside the CTE
+    # bodies and column lists, which are all parenthesized
+    depth = 0
+    for token in _CTE_TOKEN.finditer(query, match.end()):
+        text = token.group()
+        if text == "(":
+            depth += 1
+        elif text == ")":
+            depth -= 1
+        elif depth == 0 and text.lower() in _CTE_STATEMENT_KEYWORDS:
+            return text.lower()
+    return keyword
+
+def _prune_select_star(query, required_columns=None):
+    """
+    Note SELECT * and replace it with the required columns when known
+    
+    Only a statement that starts with a bare SELECT * (or SELECT DISTINCT *)
+    is recognised. A star after a CTE list or a qualified t.* is left as it
+    is, and not logged.
+    
+    Args:
+        query (str): A single SQL statement
+        required_columns (list, optional): Columns the caller actually needs
+        
+    Returns:
+        str: The query, with its star projection rewritten if columns were given
+    """
+    if not _SELECT_STAR.match(query):
+        return query
+    
+    if not required_columns:
+        logger.debug("Query selects every column with SELECT *")
+        return query
+    
+    return _SELECT_STAR.sub(lambda m: m.group(1) + ", ".join(required_columns), query, count=1)
+
+class _MySQLPool:
+    """Adapts MySQLConnectionPool to the getconn()/putconn() interface of psycopg2 pools"""
+    
+    def __init__(self, **connect_args):
+        import mysql.connector.pooling
+        
+        self.pool = mysql.connector.pooling.MySQLConnectionPool(
+            pool_size=POOL_MAX_CONNECTIONS,
+            **connect_args
+        )
+    
+    def getconn(self):
+        return self.pool.get_connection()
+    
+    def putconn(self, connection):
+        # Closing a pooled connection hands it back to the pool
+        connection.close()
+
+class _SQLitePool:
+    """Keeps opened SQLite handles for reuse behind the getconn()/putconn() interface of psycopg2 pools"""
+    
+    # Per-connection tuning: memory-map up to 256 MB of the file, keep a 64 MB
+    # page cache and build temporary tables in memory
+    PRAGMAS = (
+        "PRAGMA mmap_size = 268435456",
+        "PRAGMA cache_size = -64000",
+        "PRAGMA temp_store = MEMORY",
+    )
+    
+    def __init__(self, path):
+        self.path = path
+        self.idle = []
+        self.lock = threading.Lock()
+    
+    def getconn(self):
+        with self.lock:
+            if self.idle:
+                return self.idle.pop()
+        
+        connection = sqlite3.connect(
+            self.path,
+            cached_statements=STATEMENT_CACHE_SIZE,
+            check_same_thread=False
+        )
+        for pragma in self.PRAGMAS:
+            connection.execute(pragma)
+        return connection
+    
+    def putconn(self, connection):
+        # Never hand out a connection with a transaction left open
+        if connection.in_transaction:
+            connection.rollback()
+        with self.lock:
+            if len(self.idle) < POOL_MAX_CONNECTIONS:
+                self.idle.append(connection)
+                return
+        connection.close()
+
+class _OraclePool:
+    """Adapts cx_Oracle.SessionPool to the getconn()/putconn() interface of psycopg2 pools"""
+    
+    def __init__(self, **connect_args):
+        import cx_Oracle
+        
+        self.pool = cx_Oracle.SessionPool(
+            min=1,
+            max=POOL_MAX_CONNECTIONS,
+            increment=1,
+            threaded=True,
+            **connect_args
+        )
+    
+    def getconn(self):
+        return self.pool.acquire()
+    
+    def putconn(self, connection):
+        self.pool.release(connection)
+
+# SQLAlchemy engines keyed by connection URL. Reusing one engine per URL keeps
+# its connection pool and compiled statement cache warm across connectors.
+_engine_cache = {}
+_engine_cache_lock = threading.Lock()
+
+def _get_engine(conn_string):
+    """
+    Get the shared SQLAlchemy engine for a connection URL, creating it on first use
+    
+    Args:
+        conn_string (str): The SQLAlchemy connection URL
+        
+    Returns:
+        Engine: The cached engine
+    """
+    from sqlalchemy import create_engine
+    
+    with _engine_cache_lock:
+        engine = _engine_cache.get(conn_string)
+        if engine is None:
+            engine = create_engine(
+                conn_string,
+                pool_size=POOL_MAX_CONNECTIONS,
+                max_overflow=POOL_MAX_CONNECTIONS,
+                pool_pre_ping=True,
+                pool_recycle=ENGINE_POOL_RECYCLE
+            )
+            _engine_cache[conn_string] = engine
+    return engine
+
+class _EnginePool:
+    """Adapts a SQLAlchemy engine's pool to the getconn()/putconn() interface of psycopg2 pools"""
+    
+    def __init__(self, conn_string):
+        self.engine = _get_engine(conn_string)
+    
+    def getconn(self):
+        return self.engine.raw_connection()
+    
+    def putconn(self, connection):
+        # Closing a raw connection hands it back to the engine's pool
+        connection.close()
+
 class BaseRelationalConnector:
-    """Base class for relational database connectors"""
+    """
+    Base class for relational database connectors
+    
+    Each call checks a connection out of the shared pool and hands it back
+    when done. Use the connector as a context manager to keep one connection
+    across several calls:
+    
+        with PostgreSQLConnector(credentials) as connector:
+            schema = connector.get_schema()
+            result, success, error = connector.execute_query(query)
+    """
+    
+    # Native catalog query used by get_schema(); every connector defines one
+    _schema_sql = None
+    
+    # Resolved credential name -> (accepted form keys in priority order, default)
+    _credential_fields = {}
+    
+    # SQLAlchemy connection URL, formatted with the resolved credentials plus
+    # url_username/url_password, the login quoted for use inside a URL
+    _url_template = None
+    
+    # Cheapest statement the server must answer, used to check a connection is alive
+    _ping_sql = "SELECT 1"
+    
+    # Name of the database product, used in connection errors
+    _display_name = "database"
+    
+    # Resolved credentials connect() can't do without, as (name, error message)
+    _required_credentials = ()
+    
+    # Host built from other credentials, for services addressed by a cluster
+    # or instance name instead of a host name
+    _host_template = None
     
     def __init__(self, credentials):
         self.credentials = credentials
         self.connection = None
-        self.engine = None
+        self._engine = None
+        self._conn_string = None
+        self._pool = None
+        self._slot = None
+        self._resolved_credentials = None
+        self._in_context = False
+        self._cursor = None
+    
+    def __enter__(self):
+        self.connect()
+        self._in_context = True
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._in_context = False
+        self.disconnect()
+        return False
+    
+    @property
+    def engine(self):
+        """Shared SQLAlchemy engine for the connection URL, looked up on first access"""
+        if self._engine is None and self._conn_string:
+            self._engine = _get_engine(self._conn_string)
+        return self._engine
     
     def connect(self):
-        """Connect to the database"""
-        raise NotImplementedError("Subclasses must implement connect()")
+        """
+        Connect to the database
+        
+        Resolves and checks the credentials, then opens the connection with
+        _open_connection(). The SQLAlchemy URL is only recorded; the engine is
+        built when something first asks for it.
+        """
+        if not self.connection:
+            try:
+                creds = dict(self._resolve_credentials())
+                for name, message in self._required_credentials:
+                    if not creds[name]:
+                        raise Exception(message)
+                if self._host_template:
+                    creds["host"] = self._host_template.format(**creds)
+                
+                self.connection = self._open_connection(creds)
+                
+                # Connection URL for SQLAlchemy, which only builds the engine when needed
+                self._conn_string = self._url_template.format(**creds)
+                
+            except Exception as e:
+                logger.exception("Error connecting to %s", self._display_name)
+                raise Exception(f"Error connecting to {self._display_name}: {str(e)}")
+    
+    def _open_connection(self, creds):
+        """
+        Open a DB-API connection or check one out of the shared pool
+        
+        Args:
+            creds (dict): The resolved credentials; connectors may add keys
+                their URL template needs
+            
+        Returns:
+            object: The connection
+        """
+        raise NotImplementedError("Subclasses must implement _open_connection()")
+    
+    def _resolve_credentials(self):
+        """
+        Resolve the connector's credential fields, accepting both old and new
+        form field names, once per connector
+        
+        Returns:
+            dict: Resolved credential name -> value
+        """
+        if self._resolved_credentials is None:
+            resolved = {}
+            for name, (keys, default) in self._credential_fields.items():
+                value = None
+                for key in keys:
+                    value = self.credentials.get(key)
+                    if value:
+                        break
+                resolved[name] = value or default
+            
+            # Quote the login once so passwords with @, / or : can't break the URL
+            for name in ("username", "password"):
+                if name in resolved:
+                    resolved[f"url_{name}"] = quote_plus(str(resolved[name] or ""))
+            self._resolved_credentials = resolved
+        return self._resolved_credentials
+    
+    def _pool_key(self):
+        """Build the key identifying the shared pool for this connector's credentials"""
+        return (type(self).__name__, tuple(sorted((k, str(v)) for k, v in self.credentials.items())))
+    
+    def _checkout(self, create_pool, key=None):
+        """
+        Check a connection out of the shared pool for these credentials
+        
+        Args:
+            create_pool (callable): Builds the pool the first time these credentials are seen
+            key (tuple, optional): Pool key to use instead of the connector's own
+            
+        Returns:
+            object: A DB-API connection owned by the pool
+        """
+        if key is None:
+            key = self._pool_key()
+        slot = _acquire_query_slot(key)
+        try:
+            with _connection_pools_lock:
+                pool = _connection_pools.get(key)
+                if pool is None:
+                    pool = create_pool()
+                    _connection_pools[key] = pool
+            
+            connection = pool.getconn()
+        except Exception:
+            slot.release()
+            raise
+        
+        self._pool = pool
+        self._slot = slot
+        return connection
+    
+    def _checkout_psycopg2(self, *args, **kwargs):
+        """Check a connection out of the psycopg2 pool shared by every connector using these connect arguments"""
+        import psycopg2.pool
+        
+        return self._checkout(
+            lambda: psycopg2.pool.ThreadedConnectionPool(1, POOL_MAX_CONNECTIONS, *args, **kwargs),
+            _psycopg2_pool_key(args, kwargs)
+        )
+    
+    def _statement_cursor(self):
+        """
+        Get the plain cursor kept open for the checked-out connection
+        
+        Re-executing the same SQL on the same cursor lets pyodbc and cx_Oracle
+        reuse the statement they already prepared instead of parsing it again.
+        """
+        if self._cursor is None:
+            self._cursor = self.connection.cursor()
+        return self._cursor
     
     def disconnect(self):
-        """Disconnect from the database"""
+        """Disconnect from the database, returning pooled connections to their pool"""
         if self.connection:
             try:
-                self.connection.close()
+                if self._cursor is not None:
+                    self._cursor.close()
+                    self._cursor = None
+
+                if self._pool is not None:
+                    self._pool.putconn(self.connection)
+                else:
+                    self.connection.close()
             except Exception as e:
-                logger.error(f"Error disconnecting: {str(e)}")
+                logger.error("Error disconnecting: %s", e)
             finally:
                 self.connection = None
+                self._pool = None
+                self._cursor = None
+                if self._slot is not None:
+                    self._slot.release()
+                    self._slot = None
+    
+    def _rollback(self):
+        """Roll back a failed statement so a held connection can run the next one"""
+        if self.connection:
+            try:
+                self.connection.rollback()
+            except Exception as e:
+                logger.error("Error rolling back: %s", e)
+    
+    def _release(self):
+        """Hand the connection back after a call unless a with block still holds it"""
+        if not self._in_context:
+            self.disconnect()
+    
+    def _ping(self):
+        """Round-trip a trivial statement on the current connection"""
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute(self._ping_sql)
+            cursor.fetchall()
+        finally:
+            cursor.close()
     
     def test_connection(self):
-        """Test the connection to the database"""
+        """
+        Test the connection to the database
+        
+        Checks a connection out of the shared pool and pings it; the
+        connection goes back to the pool afterwards, ready for the next call.
+        """
         try:
             self.connect()
+            # A pooled connection may have been dropped by the server since it
+            # was opened. SQLAlchemy engines already ping on checkout.
+            if not isinstance(self._pool, _EnginePool):
+                self._ping()
             return True, "Connection successful"
         except Exception as e:
             return False, f"Connection failed: {str(e)}"
         finally:
-            self.disconnect()
+            self._release()
+    
+    def refresh_schema(self):
+        """Drop the cached schema so the next get_schema() reads it from the database"""
+        with _schema_cache_lock:
+            _schema_cache.pop(self._pool_key(), None)
     
     def get_schema(self):
-        """Get the schema of the database"""
+        """
+        Get the schema of the database
+        
+        Schemas are cached per credentials for SCHEMA_CACHE_TTL seconds; call
+        refresh_schema() after DDL to see the change sooner. Concurrent calls
+        for the same database wait for a single read instead of each scanning
+        the catalog. Every caller gets its own copy of the schema.
+        """
+        key = self._pool_key()
+        with _schema_cache_lock:
+            cached = _schema_cache.get(key)
+            if cached and time.monotonic() - cached[0] < SCHEMA_CACHE_TTL:
+                return copy.deepcopy(cached[1])
+            
+            read = _schema_reads.get(key)
+            reading = read is None
+            if reading:
+                read = _schema_reads[key] = (threading.Event(), [])
+        
+        done, outcome = read
+        if not reading:
+            if done.wait(SCHEMA_WAIT_TIMEOUT) and outcome:
+                return copy.deepcopy(outcome[0])
+            logger.warning("Concurrent schema read did not finish, reading the schema again")
+            return self._read_schema()
+        
+        try:
+            # Callers may edit the schema they get back, so the shared copy is
+            # never handed out
+            schema_info = self._read_schema()
+            outcome.append(copy.deepcopy(schema_info))
+            if "error" not in schema_info:
+                with _schema_cache_lock:
+                    _schema_cache[key] = (time.monotonic(), outcome[0])
+            return schema_info
+        finally:
+            with _schema_cache_lock:
+                _schema_reads.pop(key, None)
+            done.set()
+    
+    def _read_schema(self):
+        """Read the schema from the database"""
         try:
             self.connect()
             
-            # For SQLAlchemy-compatible connectors
-            if self.engine:
-                inspector = inspect(self.engine)
-                schema_info = {
-                    "tables": []
-                }
-                
-                for table_name in inspector.get_table_names():
-                    table_info = {
-                        "name": table_name,
-                        "columns": []
-                    }
-                    
-                    for column in inspector.get_columns(table_name):
-                        column_info = {
-                            "name": column["name"],
-                            "type": str(column["type"]),
-                            "nullable": column.get("nullable", True)
-                        }
-                        table_info["columns"].append(column_info)
-                    
-                    schema_info["tables"].append(table_info)
-                
-                return schema_info
-            else:
-                # Fallback for non-SQLAlchemy connectors
-                return {"error": "Schema retrieval not implemented for this connector"}
+            # Read the whole schema in a single catalog round trip when possible
+            if self._schema_sql:
+                return self._get_catalog_schema()
+            
+            return {"error": "Schema retrieval not implemented for this connector"}
                 
         except Exception as e:
             logger.exception("Error getting schema")
             return {"error": f"Error getting schema: {str(e)}"}
         finally:
-            self.disconnect()
+            self._release()
     
-    def execute_query(self, query):
+    def _get_catalog_schema(self):
         """
-        Execute a query against the database
+        Build the schema from the connector's native catalog query
+        
+        Returns:
+            dict: Schema info with the tables and their columns
+        """
+        schema_info = {
+            "tables": []
+        }
+        
+        for table_name, rows in groupby(self._catalog_rows(), key=itemgetter(0)):
+            table_info = {
+                "name": _as_text(table_name),
+                "columns": [
+                    {
+                        "name": _as_text(row[1]),
+                        "type": _as_text(row[2]),
+                        "nullable": bool(row[3])
+                    }
+                    for row in rows
+                ]
+            }
+            schema_info["tables"].append(table_info)
+        
+        return schema_info
+    
+    def _catalog_rows(self):
+        """Run the catalog query and return all of its rows"""
+        cursor = self.connection.cursor()
+        cursor.execute(self._schema_sql)
+        return cursor.fetchall()
+    
+    def _select_cursor(self):
+        """
+        Open the cursor used for SELECT statements
+        
+        Subclasses override this to stream rows from the server instead of
+        buffering the whole result set client-side.
+        """
+        return self.connection.cursor()
+    
+    def _execute_select(self, query):
+        """
+        Execute a SELECT, WITH or VALUES query and return its cursor
         
         Args:
             query (str): The query to execute
             
+        Returns:
+            cursor: The cursor to read the rows from
+        """
+        cursor = self._select_cursor()
+        cursor.execute(query)
+        return cursor
+    
+    def _fetch_results(self, cursor, max_rows=None, result_format="records"):
+        """
+        Read the rows of an executed SELECT in fetchmany() chunks
+        
+        Args:
+            cursor: A cursor that has executed a SELECT statement
+            max_rows (int, optional): Stop after this many rows
+            result_format (str): "records" for one dict per row, "namedtuple"
+                for one namedtuple per row, or "columnar" for one list of values
+                per column
+            
+        Returns:
+            list or dict: Row dicts or namedtuples, or column name -> values
+        """
+        columnar = result_format == "columnar"
+        make_row = None
+        
+        # Size the result list up front when the driver already knows the row count
+        expected = cursor.rowcount if cursor.rowcount and cursor.rowcount > 0 else 0
+        if max_rows is not None:
+            expected = min(expected, max_rows)
+        results = [None] * expected if not columnar else None
+        filled = 0
+        columns = None
+        
+        while max_rows is None or filled < max_rows:
+            chunk_size = FETCH_CHUNK_SIZE
+            if max_rows is not None:
+                chunk_size = min(chunk_size, max_rows - filled)
+            
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            
+            # Server-side cursors only describe their columns after the first fetch
+            if columns is None:
+                columns = [col[0] for col in cursor.description]
+                if result_format == "namedtuple":
+                    # One row class per result set, so every row shares its field names
+                    make_row = namedtuple("Row", columns, rename=True)._make
+            
+            # Values are returned as the driver produced them; Decimal and
+            # datetime values are converted when the response is serialized
+            if columnar:
+                if results is None:
+                    results = [[] for _ in columns]
+                for column_values, chunk_values in zip(results, zip(*rows)):
+                    column_values.extend(chunk_values)
+            elif make_row is not None:
+                results[filled:filled + len(rows)] = list(map(make_row, rows))
+            else:
+                # Driver dict cursors wouldn't save work here: psycopg2's
+                # RealDictCursor and mysql-connector's dictionary cursors build
+                # each row in Python too, and sqlite3.Row isn't a dict
+                results[filled:filled + len(rows)] = [dict(zip(columns, row)) for row in rows]
+            filled += len(rows)
+        
+        if columnar:
+            if columns is None:
+                columns = [col[0] for col in cursor.description or ()]
+            return dict(zip(columns, results or [[] for _ in columns]))
+        
+        del results[filled:]
+        return results
+    
+    def execute_query(self, query, max_rows=None, required_columns=None, result_format="records"):
+        """
+        Execute a query against the database
+        
+        Args:
+            query (str or list): The query to execute, or a list of DML
+                statements to run as one batch with execute_statements()
+            max_rows (int, optional): Maximum number of rows to return for SELECT queries
+            required_columns (list, optional): Columns to select in place of SELECT *
+            result_format (str): "records" for a list of row dicts, "namedtuple"
+                for a list of namedtuples, or "columnar" for a dict of column
+                name -> list of values
+            
         Returns:
             tuple: (result, success, error_message)
         """
+        if isinstance(query, (list, tuple)):
+            return self.execute_statements(query)
+        
         try:
             self.connect()
             
-            cursor = self.connection.cursor()
+            # Handle SQLite limitation of only executing one statement at a time.
+            # Other drivers either accept multi-statement strings or reject them
+            # themselves, so the query is only split for SQLite.
+            statements = None
+            if isinstance(self.connection, sqlite3.Connection):
+                statements = _split_sqlite_statements(query)
             
-            # Handle SQLite limitation of only executing one statement at a time
-            if ";" in query and isinstance(self.connection, sqlite3.Connection):
-                statements = [stmt.strip() for stmt in query.split(';') if stmt.strip()]
+            if statements and len(statements) > 1:
+                cursor = self._statement_cursor()
+                
+                # Scripts without a SELECT run in one call through SQLite's native
+                # multi-statement API instead of one execute() per statement
+                keywords = [_leading_keyword(stmt) for stmt in statements]
+                if not _RESULT_KEYWORDS.intersection(keywords):
+                    changes_before = self.connection.total_changes
+                    cursor.executescript(query)
+                    if _DDL_KEYWORDS.intersection(keywords):
+                        self.refresh_schema()
+                    return {"affected_rows": self.connection.total_changes - changes_before}, True, None
                 
                 # For multiple statements, execute each one and return the results of the last statement
                 # This is typically used for schema-related queries
@@ -140,39 +881,25 @@ class BaseRelationalConnector:
                 success = False
                 error_message = None
                 
-                for i, stmt in enumerate(statements):
+                for i, (stmt, keyword) in enumerate(zip(statements, keywords)):
                     try:
                         cursor.execute(stmt)
                         
                         # Process results for the statement
-                        if stmt.strip().upper().startswith("SELECT"):
-                            columns = [col[0] for col in cursor.description]
-                            stmt_results = []
-                            
-                            for row in cursor.fetchall():
-                                # Create a row dict with proper type conversions
-                                row_dict = {}
-                                for i, value in enumerate(row):
-                                    col_name = columns[i]
-                                    # Handle Decimal values by converting to float
-                                    from decimal import Decimal
-                                    if isinstance(value, Decimal):
-                                        row_dict[col_name] = float(value)
-                                    else:
-                                        row_dict[col_name] = value
-                                stmt_results.append(row_dict)
-                            
-                            results = stmt_results
+                        if keyword in _RESULT_KEYWORDS:
+                            results = self._fetch_results(cursor, max_rows, result_format)
                             success = True
                         else:
                             # For non-SELECT queries
                             affected_rows = cursor.rowcount
                             self.connection.commit()
+                            if keyword in _DDL_KEYWORDS:
+                                self.refresh_schema()
                             results = {"affected_rows": affected_rows}
                             success = True
                             
                     except Exception as stmt_error:
-                        logger.error(f"Error executing statement {i+1}: {stmt_error}")
+                        logger.error("Error executing statement %s: %s", i + 1, stmt_error)
                         error_message = f"Error executing statement {i+1}: {str(stmt_error)}"
                         # Continue to next statement
                 
@@ -180,311 +907,824 @@ class BaseRelationalConnector:
             
             else:
                 # Single statement execution
-                cursor.execute(query)
+                keyword = _leading_keyword(query)
+                returns_rows = keyword in _RESULT_KEYWORDS
+                if keyword == "select":
+                    query = _prune_select_star(query, required_columns)
+                # SHOW, EXPLAIN and the like return rows but can't be declared as a cursor
+                if keyword in _CURSOR_KEYWORDS:
+                    cursor = self._execute_select(query)
+                else:
+                    cursor = self._statement_cursor()
+                    cursor.execute(query)
                 
-                # Check if the query is a SELECT query
-                if query.strip().upper().startswith("SELECT"):
-                    columns = [col[0] for col in cursor.description]
-                    results = []
-                    
-                    for row in cursor.fetchall():
-                        # Create a row dict with proper type conversions
-                        row_dict = {}
-                        for i, value in enumerate(row):
-                            col_name = columns[i]
-                            # Handle Decimal values by converting to float
-                            from decimal import Decimal
-                            if isinstance(value, Decimal):
-                                row_dict[col_name] = float(value)
-                            else:
-                                row_dict[col_name] = value
-                        results.append(row_dict)
-                    
-                    return results, True, None
+                # Check if the query returns rows. Named cursors only describe
+                # their columns after the first fetch, so plain cursors alone
+                # can fall back to the commit path when nothing came back
+                if returns_rows and (keyword in _CURSOR_KEYWORDS or cursor.description is not None):
+                    return self._fetch_results(cursor, max_rows, result_format), True, None
                 else:
                     # For non-SELECT queries
                     affected_rows = cursor.rowcount
                     self.connection.commit()
+                    if keyword in _DDL_KEYWORDS:
+                        self.refresh_schema()
                     return {"affected_rows": affected_rows}, True, None
                 
         except Exception as e:
-            logger.exception(f"Error executing query: {query}")
+            logger.exception("Error executing query: %s", query)
+            self._rollback()
             return None, False, f"Error executing query: {str(e)}"
         finally:
-            self.disconnect()
+            self._release()
+    
+    def stream_query(self, query):
+        """
+        Execute a SELECT and yield its rows one fetchmany() chunk at a time
+        
+        The connection stays checked out until the generator is exhausted or
+        closed, so only one chunk of rows is held in memory at once.
+        
+        Args:
+            query (str): The SELECT query to execute
+            
+        Yields:
+            list: Up to FETCH_CHUNK_SIZE row dicts keyed by column name
+        """
+        try:
+            self.connect()
+            
+            cursor = self._select_cursor()
+            cursor.execute(query)
+            
+            columns = None
+            while True:
+                rows = cursor.fetchmany(FETCH_CHUNK_SIZE)
+                if not rows:
+                    break
+                
+                # Server-side cursors only describe their columns after the first fetch
+                if columns is None:
+                    columns = [col[0] for col in cursor.description]
+                
+                yield [dict(zip(columns, row)) for row in rows]
+        finally:
+            self._release()
+    
+    def schema_then_query(self, query, max_rows=None):
+        """
+        Get the schema and execute a query on a single checked-out connection
+        
+        A cached schema costs no round trip at all; otherwise the catalog read
+        and the query share one connection instead of two checkouts.
+        
+        Args:
+            query (str): The query to execute
+            max_rows (int, optional): Maximum number of rows to return for SELECT queries
+            
+        Returns:
+            tuple: (schema_info, (result, success, error_message))
+        """
+        held = self._in_context
+        self._in_context = True
+        try:
+            return self.get_schema(), self.execute_query(query, max_rows)
+        finally:
+            self._in_context = held
+            self._release()
+    
+    def execute_queries(self, queries, max_rows=None):
+        """
+        Execute several independent queries on a single checked-out connection
+        
+        Each query is committed or fails on its own, as with execute_query(),
+        but they all share one checkout instead of paying one each.
+        
+        Args:
+            queries (list): The queries to execute in order
+            max_rows (int, optional): Maximum number of rows to return for each SELECT query
+            
+        Returns:
+            list: One (result, success, error_message) tuple per query
+        """
+        held = self._in_context
+        self._in_context = True
+        try:
+            return [self.execute_query(query, max_rows) for query in queries]
+        finally:
+            self._in_context = held
+            self._release()
+    
+    def execute_query_json(self, query, max_rows=None):
+        """
+        Execute a query and return its result already serialized as JSON
+        
+        SELECT rows are serialized one fetchmany() chunk at a time, so only
+        the encoded bytes of earlier chunks are kept rather than their dicts.
+        
+        Args:
+            query (str): The query to execute
+            max_rows (int, optional): Maximum number of rows to return for SELECT queries
+            
+        Returns:
+            tuple: (json_bytes, success, error_message)
+        """
+        if _leading_keyword(query) not in _CURSOR_KEYWORDS:
+            result, success, error_message = self.execute_query(query, max_rows)
+            return (json_dumps_bytes(result) if success else None), success, error_message
+        
+        try:
+            self.connect()
+            
+            cursor = self._select_cursor()
+            cursor.execute(query)
+            
+            parts = []
+            fetched = 0
+            columns = None
+            while max_rows is None or fetched < max_rows:
+                chunk_size = FETCH_CHUNK_SIZE
+                if max_rows is not None:
+                    chunk_size = min(chunk_size, max_rows - fetched)
+                
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                
+                # Server-side cursors only describe their columns after the first fetch
+                if columns is None:
+                    columns = [col[0] for col in cursor.description]
+                
+                # Keep each chunk's array body so the chunks join into one array
+                parts.append(json_dumps_bytes([dict(zip(columns, row)) for row in rows])[1:-1])
+                fetched += len(rows)
+            
+            return b"[" + b",".join(parts) + b"]", True, None
+            
+        except Exception as e:
+            logger.exception("Error executing query: %s", query)
+            self._rollback()
+            return None, False, f"Error executing query: {str(e)}"
+        finally:
+            self._release()
+    
+    def _fork(self):
+        """
+        Create a connector for the same credentials that checks out its own connection
+        
+        The fork shares this connector's pools and schema cache, so it is cheap,
+        but it never touches self.connection and is safe to use from another thread.
+        """
+        fork = type(self)(self.credentials)
+        fork._resolved_credentials = self._resolved_credentials
+        return fork
+    
+    async def aget_schema(self):
+        """
+        Get the schema without blocking the event loop
+        
+        Runs on a forked connector in a worker thread, so it can be awaited
+        together with aexecute_query() to overlap both round trips:
+        
+            schema, (result, success, error) = await asyncio.gather(
+                connector.aget_schema(), connector.aexecute_query(query)
+            )
+        
+        Returns:
+            dict: The schema, as returned by get_schema()
+        """
+        return await asyncio.to_thread(self._fork().get_schema)
+    
+    async def aexecute_query(self, query, max_rows=None, required_columns=None, result_format="records"):
+        """
+        Execute a query without blocking the event loop
+        
+        The blocking driver call runs in a worker thread on a forked connector
+        with its own pooled connection, so concurrent coroutines overlap their
+        database round trips.
+        
+        Args:
+            query (str): The query to execute
+            max_rows (int, optional): Maximum number of rows to return for SELECT queries
+            required_columns (list, optional): Columns to select in place of SELECT *
+            result_format (str): "records", "namedtuple" or "columnar", as for execute_query()
+            
+        Returns:
+            tuple: (result, success, error_message)
+        """
+        return await asyncio.to_thread(
+            self._fork().execute_query, query, max_rows, required_columns, result_format
+        )
+    
+    def execute_statements(self, statements):
+        """
+        Execute several DML statements in one transaction with a single commit
+        
+        Either every statement is applied or, if one fails, none of them are.
+        
+        Args:
+            statements (list): The statements to execute in order
+            
+        Returns:
+            tuple: (result, success, error_message)
+        """
+        try:
+            self.connect()
+            
+            cursor = self._statement_cursor()
+            affected_rows = 0
+            for statement in statements:
+                cursor.execute(statement)
+                if cursor.rowcount > 0:
+                    affected_rows += cursor.rowcount
+            self.connection.commit()
+            if _DDL_KEYWORDS.intersection(map(_leading_keyword, statements)):
+                self.refresh_schema()
+            return {"affected_rows": affected_rows}, True, None
+            
+        except Exception as e:
+            logger.exception("Error executing batch of %s statements", len(statements))
+            if self.connection:
+                self.connection.rollback()
+            return None, False, f"Error executing batch: {str(e)}"
+        finally:
+            self._release()
+    
+    def _executemany(self, cursor, query, rows):
+        """Run a parameterized statement for every row using the driver's batch API"""
+        cursor.executemany(query, rows)
+    
+    def execute_many(self, query, rows):
+        """
+        Execute a parameterized DML statement once for each row in a single batch
+        
+        Args:
+            query (str): The statement, using the driver's parameter style
+            rows (list): A sequence of parameter tuples
+            
+        Returns:
+            tuple: (result, success, error_message)
+        """
+        try:
+            self.connect()
+            
+            cursor = self.connection.cursor()
+            self._executemany(cursor, query, rows)
+            affected_rows = cursor.rowcount
+            self.connection.commit()
+            return {"affected_rows": affected_rows}, True, None
+            
+        except Exception as e:
+            logger.exception("Error executing batch: %s", query)
+            self._rollback()
+            return None, False, f"Error executing batch: {str(e)}"
+        finally:
+            self._release()
+
+# Installed Microsoft ODBC drivers, e.g. "ODBC Driver 18 for SQL Server"
+_MSSQL_DRIVER = re.compile(r"ODBC Driver (\d+) for SQL Server")
+
+@lru_cache(maxsize=1)
+def _sqlserver_odbc_driver():
+    """Pick the newest installed SQL Server ODBC driver, probed once per process"""
+    import pyodbc
+    
+    newest = (0, "ODBC Driver 17 for SQL Server")
+    for name in pyodbc.drivers():
+        match = _MSSQL_DRIVER.fullmatch(name)
+        if match:
+            newest = max(newest, (int(match.group(1)), name))
+    return newest[1]
+
+@lru_cache(maxsize=1)
+def _env_database_url():
+    """DATABASE_URL from the environment, read once per process"""
+    return os.environ.get("DATABASE_URL")
+
+def _psycopg2_executemany(cursor, query, rows):
+    """
+    Batch rows through psycopg2, folding them into multi-row INSERTs when the
+    statement uses a single VALUES %s placeholder
+    """
+    import psycopg2.extras
+    
+    if _VALUES_PLACEHOLDER.search(query):
+        psycopg2.extras.execute_values(cursor, query, rows, page_size=FETCH_CHUNK_SIZE)
+    else:
+        psycopg2.extras.execute_batch(cursor, query, rows, page_size=FETCH_CHUNK_SIZE)
+
+def _csv_field(value):
+    """Format a value for COPY ... WITH (FORMAT csv); only an unquoted empty field is NULL"""
+    if value is None:
+        return ""
+    return '"' + str(value).replace('"', '""') + '"'
+
+def _copy_rows_in(cursor, table, columns, rows):
+    """
+    Stream rows into a table with one COPY FROM STDIN statement
+    
+    Returns:
+        int: The number of rows copied
+    """
+    import psycopg2.sql
+    
+    statement = psycopg2.sql.SQL("COPY {} ({}) FROM STDIN WITH (FORMAT csv)").format(
+        psycopg2.sql.Identifier(table),
+        psycopg2.sql.SQL(", ").join(map(psycopg2.sql.Identifier, columns))
+    )
+    data = io.StringIO("".join(
+        ",".join(map(_csv_field, row)) + "\n" for row in rows
+    ))
+    cursor.copy_expert(statement, data)
+    return cursor.rowcount
+
+def _copy_query_out(cursor, query):
+    """
+    Run a SELECT through COPY TO STDOUT and collect its rows as CSV
+    
+    Returns:
+        bytes: The CSV document, starting with a header row
+    """
+    buffer = io.BytesIO()
+    cursor.copy_expert(f"COPY ({query.strip().rstrip(';')}) TO STDOUT WITH (FORMAT csv, HEADER)", buffer)
+    return buffer.getvalue()
 
 class PostgreSQLConnector(BaseRelationalConnector):
     """Connector for PostgreSQL databases"""
     
+    _schema_sql = _INFORMATION_SCHEMA_SQL.format(schema="current_schema()")
+    _credential_fields = {**_HOST_CREDENTIAL_FIELDS, "port": (("port",), 5432)}
+    _url_template = "postgresql://{url_username}:{url_password}@{host}:{port}/{db_name}"
+    _display_name = "PostgreSQL"
+    _required_credentials = (("db_name", "No database name provided"),)
+    
+    def _select_cursor(self):
+        """Open a named cursor so psycopg2 streams rows from a server-side portal"""
+        return self.connection.cursor(name=f"sdb_{uuid.uuid4().hex}")
+    
+    def _executemany(self, cursor, query, rows):
+        """Batch rows with psycopg2's execute_values/execute_batch helpers"""
+        _psycopg2_executemany(cursor, query, rows)
+    
+    def refresh_schema(self):
+        """Drop the cached schema and the prepared query plans built against it"""
+        global _prepared_generation
+        super().refresh_schema()
+        with _prepared_statements_lock:
+            _prepared_generation += 1
+    
+    def _execute_select(self, query):
+        """
+        Run repeated queries through server-side prepared statements
+        
+        The first run of a query streams through a named cursor as usual. When
+        the same query comes back on the connection, as LLM refinements often
+        do, it is PREPAREd so later runs skip parsing, rewriting and planning.
+        EXECUTE can't be declared as a cursor, so prepared results are read
+        through the client-side cursor, and only queries with a LIMIT of at
+        most PREPARED_MAX_ROWS are prepared.
+        """
+        text = query.strip().rstrip(";").rstrip()
+        limit = _TRAILING_LIMIT.search(text)
+        if ";" in text or not limit or int(limit.group(1)) > PREPARED_MAX_ROWS:
+            return super()._execute_select(query)
+        name = "p_" + hashlib.md5(text.encode()).hexdigest()[:16]
+        
+        with _prepared_statements_lock:
+            state = _prepared_statements.get(self.connection)
+            stale = state is not None and state[0] != _prepared_generation
+            if state is None or stale:
+                state = _prepared_statements[self.connection] = [_prepared_generation, {}]
+        plans = state[1]
+        
+        cursor = self._statement_cursor()
+        if stale:
+            cursor.execute("DEALLOCATE ALL")
+        
+        if name not in plans:
+            if len(plans) >= STATEMENT_CACHE_SIZE:
+                cursor.execute("DEALLOCATE ALL")
+                plans.clear()
+            plans[name] = False
+            return super()._execute_select(query)
+        
+        # Outside a transaction the buffered EXECUTE runs in autocommit, saving
+        # the BEGIN before it and the ROLLBACK when the connection is returned
+        import psycopg2.errors
+        import psycopg2.extensions
+        idle = self.connection.info.transaction_status == psycopg2.extensions.TRANSACTION_STATUS_IDLE
+        try:
+            if idle:
+                self.connection.autocommit = True
+            for retry in (True, False):
+                try:
+                    if not plans[name]:
+                        cursor.execute(f"PREPARE {name} AS {text}")
+                        plans[name] = True
+                    cursor.execute(f"EXECUTE {name}")
+                    return cursor
+                except psycopg2.errors.FeatureNotSupported as e:
+                    # DDL from another session changed the plan's result
+                    # columns, so it is prepared again and run once more
+                    if not retry or "cached plan must not change result type" not in str(e):
+                        raise
+                    if not idle:
+                        self.connection.rollback()
+                    cursor.execute(f"DEALLOCATE {name}")
+                    plans[name] = False
+        except Exception:
+            # A failed plan can't be trusted any more, so the connection's
+            # statements are deallocated on its next query
+            state[0] = None
+            raise
+        finally:
+            if idle:
+                self.connection.autocommit = False
+    
+    def copy_rows(self, table, columns, rows):
+        """
+        Bulk-load rows into a table with COPY FROM STDIN
+        
+        COPY streams every row in a single statement, which is far faster than
+        INSERTs for large loads.
+        
+        Args:
+            table (str): The target table
+            columns (list): The target column names, in row order
+            rows (list): A sequence of value tuples
+            
+        Returns:
+            tuple: (result, success, error_message)
+        """
+        try:
+            self.connect()
+            
+            affected_rows = _copy_rows_in(self._statement_cursor(), table, columns, rows)
+            self.connection.commit()
+            return {"affected_rows": affected_rows}, True, None
+            
+        except Exception as e:
+            logger.exception("Error copying rows into %s", table)
+            self._rollback()
+            return None, False, f"Error copying rows: {str(e)}"
+        finally:
+            self._release()
+    
+    def export_csv(self, query):
+        """
+        Export the result of a SELECT as CSV with COPY TO STDOUT
+        
+        The server formats the rows itself, so large exports skip building a
+        Python row and dict per result row.
+        
+        Args:
+            query (str): The SELECT query to export
+            
+        Returns:
+            tuple: (csv_bytes, success, error_message)
+        """
+        try:
+            self.connect()
+            return _copy_query_out(self._statement_cursor(), query), True, None
+            
+        except Exception as e:
+            logger.exception("Error exporting query: %s", query)
+            self._rollback()
+            return None, False, f"Error exporting query: {str(e)}"
+        finally:
+            self._release()
+    
     def connect(self):
-        """Connect to a PostgreSQL database"""
-        if not self.connection:
-            try:
-                # Check if direct connection string is provided
-                if self.credentials.get("connection_string"):
-                    logger.info("Using provided connection string")
-                    self.connection = psycopg2.connect(self.credentials.get("connection_string"))
-                    self.engine = create_engine(self.credentials.get("connection_string"))
-                # Fall back to environment variables if available
-                elif os.environ.get("DATABASE_URL"):
-                    logger.info("Using DATABASE_URL from environment variables")
-                    self.connection = psycopg2.connect(os.environ["DATABASE_URL"])
-                    self.engine = create_engine(os.environ["DATABASE_URL"])
-                # Check if individual credentials are provided
-                else:
-                    logger.info("Using individual credentials")
-                    # Support both old and new field names from form
-                    host = self.credentials.get("host") or self.credentials.get("hostname", "localhost") 
-                    db_name = self.credentials.get("database_name") or self.credentials.get("db_name")
-                    
-                    if not db_name:
-                        raise Exception("No database name provided")
-                    
-                    self.connection = psycopg2.connect(
-                        host=host,
-                        port=self.credentials.get("port", 5432),
-                        user=self.credentials.get("username"),
-                        password=self.credentials.get("password"),
-                        dbname=db_name
-                    )
-                    
-                    # Create SQLAlchemy engine for schema inspection
-                    conn_string = f"postgresql://{self.credentials.get('username')}:{self.credentials.get('password')}@{host}:{self.credentials.get('port', 5432)}/{db_name}"
-                    self.engine = create_engine(conn_string)
-                
-            except Exception as e:
-                logger.exception("Error connecting to PostgreSQL")
-                raise Exception(f"Error connecting to PostgreSQL: {str(e)}")
+        """Connect to a PostgreSQL database, preferring a connection string or DATABASE_URL"""
+        if self.connection:
+            return
+        
+        # Check if direct connection string is provided
+        if self.credentials.get("connection_string"):
+            logger.debug("Using provided connection string")
+            dsn = self.credentials["connection_string"]
+        # Fall back to environment variables if available
+        elif _env_database_url():
+            logger.debug("Using DATABASE_URL from environment variables")
+            dsn = _env_database_url()
+        # Otherwise build the connection from the individual credentials
+        else:
+            logger.debug("Using individual credentials")
+            super().connect()
+            return
+        
+        try:
+            self.connection = self._checkout_psycopg2(dsn)
+            self._conn_string = dsn
+            
+        except Exception as e:
+            logger.exception("Error connecting to PostgreSQL")
+            raise Exception(f"Error connecting to PostgreSQL: {str(e)}")
+    
+    def _open_connection(self, creds):
+        """Check a connection out of a psycopg2 pool built from the individual credentials"""
+        return self._checkout_psycopg2(
+            host=creds["host"],
+            port=creds["port"],
+            user=creds["username"],
+            password=creds["password"],
+            dbname=creds["db_name"]
+        )
 
 class MySQLConnector(BaseRelationalConnector):
     """Connector for MySQL databases"""
     
+    _schema_sql = _INFORMATION_SCHEMA_SQL.format(schema="DATABASE()")
+    _credential_fields = {**_HOST_CREDENTIAL_FIELDS, "port": (("port",), 3306)}
+    _url_template = "mysql+mysqlconnector://{url_username}:{url_password}@{host}:{port}/{db_name}"
+    _display_name = "MySQL"
+    _required_credentials = (("db_name", "No database name provided"),)
+    
     def connect(self):
-        """Connect to a MySQL database"""
-        if not self.connection:
-            try:
-                # Check if direct connection string is provided
-                if self.credentials.get("connection_string"):
-                    logger.info("Using provided connection string")
-                    # Using SQLAlchemy for both connection and schema inspection
-                    self.engine = create_engine(self.credentials.get("connection_string"))
-                    self.connection = self.engine.connect().connection
-                # Check if individual credentials are provided
-                else:
-                    logger.info("Using individual credentials")
-                    
-                    # Support both old and new field names from form
-                    host = self.credentials.get("host") or self.credentials.get("hostname", "localhost")
-                    db_name = self.credentials.get("database_name") or self.credentials.get("db_name")
-                    port = self.credentials.get("port", 3306)
-                    
-                    if not db_name:
-                        raise Exception("No database name provided")
-                    
-                    self.connection = mysql.connector.connect(
-                        host=host,
-                        port=port,
-                        user=self.credentials.get("username"),
-                        password=self.credentials.get("password"),
-                        database=db_name
-                    )
-                    
-                    # Create SQLAlchemy engine for schema inspection
-                    conn_string = f"mysql+mysqlconnector://{self.credentials.get('username')}:{self.credentials.get('password')}@{host}:{port}/{db_name}"
-                    self.engine = create_engine(conn_string)
-            except Exception as e:
-                logger.exception("Error connecting to MySQL")
-                raise Exception(f"Error connecting to MySQL: {str(e)}")
+        """Connect to a MySQL database, preferring a connection string"""
+        if self.connection:
+            return
+        
+        # Otherwise build the connection from the individual credentials
+        if not self.credentials.get("connection_string"):
+            logger.debug("Using individual credentials")
+            super().connect()
+            return
+        
+        try:
+            logger.debug("Using provided connection string")
+            # Using SQLAlchemy for both connection and schema inspection
+            conn_string = self.credentials["connection_string"]
+            self.connection = self._checkout(lambda: _EnginePool(conn_string))
+            self._engine = self._pool.engine
+            
+        except Exception as e:
+            logger.exception("Error connecting to MySQL")
+            raise Exception(f"Error connecting to MySQL: {str(e)}")
+    
+    def _open_connection(self, creds):
+        """Check a connection out of a MySQL pool built from the individual credentials"""
+        return self._checkout(
+            lambda: _MySQLPool(
+                host=creds["host"],
+                port=creds["port"],
+                user=creds["username"],
+                password=creds["password"],
+                database=creds["db_name"]
+            )
+        )
 
 class SQLServerConnector(BaseRelationalConnector):
     """Connector for SQL Server databases"""
     
-    def connect(self):
-        """Connect to a SQL Server database"""
-        if not self.connection:
-            try:
-                connection_string = f"DRIVER={{ODBC Driver 17 for SQL Server}};SERVER={self.credentials.get('host')}\\{self.credentials.get('instance')};UID={self.credentials.get('username')};PWD={self.credentials.get('password')}"
-                self.connection = pyodbc.connect(connection_string)
-                
-                # Create SQLAlchemy engine for schema inspection
-                conn_string = f"mssql+pyodbc://{self.credentials.get('username')}:{self.credentials.get('password')}@{self.credentials.get('host')}\\{self.credentials.get('instance')}?driver=ODBC+Driver+17+for+SQL+Server"
-                self.engine = create_engine(conn_string)
-                
-            except Exception as e:
-                logger.exception("Error connecting to SQL Server")
-                raise Exception(f"Error connecting to SQL Server: {str(e)}")
+    _schema_sql = _INFORMATION_SCHEMA_SQL.format(schema="SCHEMA_NAME()")
+    _credential_fields = {
+        "host": (("host",), None),
+        "instance": (("instance",), None),
+        "username": (("username",), None),
+        "password": (("password",), None),
+        "prefetch_size": (("prefetch_size",), FETCH_CHUNK_SIZE),
+        "driver": (("driver",), None),
+    }
+    _odbc_template = "DRIVER={{{driver}}};SERVER={host}\\{instance};UID={odbc_username};PWD={odbc_password}"
+    _url_template = "mssql+pyodbc://{url_username}:{url_password}@{host}\\{instance}?driver={url_driver}"
+    _display_name = "SQL Server"
+    
+    def _resolve_credentials(self):
+        """
+        Resolve credentials, bracing the login so ; or } can't break the ODBC
+        string, and fill in the newest installed ODBC driver unless one is given
+        """
+        if self._resolved_credentials is None:
+            resolved = super()._resolve_credentials()
+            for name in ("username", "password"):
+                resolved[f"odbc_{name}"] = "{" + str(resolved[name] or "").replace("}", "}}") + "}"
+            resolved["driver"] = resolved["driver"] or _sqlserver_odbc_driver()
+            resolved["url_driver"] = quote_plus(resolved["driver"])
+        return self._resolved_credentials
+    
+    def _select_cursor(self):
+        """Reuse the statement cursor, fetching prefetch_size rows per round trip"""
+        cursor = self._statement_cursor()
+        cursor.arraysize = int(self._resolve_credentials()["prefetch_size"])
+        return cursor
+    
+    def _executemany(self, cursor, query, rows):
+        """Send all rows in one parameter array instead of one round trip per row"""
+        cursor.fast_executemany = True
+        cursor.executemany(query, rows)
+    
+    def _open_connection(self, creds):
+        """Open a pyodbc connection, which pools connections in the ODBC driver manager"""
+        import pyodbc
+        
+        return pyodbc.connect(self._odbc_template.format(**creds))
 
 class OracleConnector(BaseRelationalConnector):
     """Connector for Oracle databases"""
     
-    def connect(self):
-        """Connect to an Oracle database"""
-        if not self.connection:
-            try:
-                dsn = cx_Oracle.makedsn(
-                    self.credentials.get("host"),
-                    self.credentials.get("port", 1521),
-                    service_name=self.credentials.get("service_name")
-                )
-                self.connection = cx_Oracle.connect(
-                    user=self.credentials.get("username"),
-                    password=self.credentials.get("password"),
-                    dsn=dsn
-                )
-                
-                # Create SQLAlchemy engine for schema inspection
-                conn_string = f"oracle+cx_oracle://{self.credentials.get('username')}:{self.credentials.get('password')}@{dsn}"
-                self.engine = create_engine(conn_string)
-                
-            except Exception as e:
-                logger.exception("Error connecting to Oracle")
-                raise Exception(f"Error connecting to Oracle: {str(e)}")
+    _schema_sql = """
+        SELECT c.table_name, c.column_name, c.data_type,
+               CASE WHEN c.nullable = 'Y' THEN 1 ELSE 0 END
+        FROM user_tab_columns c
+        JOIN user_tables t ON t.table_name = c.table_name
+        ORDER BY c.table_name, c.column_id
+    """
+    _credential_fields = {
+        "host": (("host",), None),
+        "port": (("port",), 1521),
+        "service_name": (("service_name",), None),
+        "username": (("username",), None),
+        "password": (("password",), None),
+        "prefetch_size": (("prefetch_size",), FETCH_CHUNK_SIZE),
+    }
+    _url_template = "oracle+cx_oracle://{url_username}:{url_password}@{dsn}"
+    _ping_sql = "SELECT 1 FROM DUAL"
+    _display_name = "Oracle"
+    
+    def _select_cursor(self):
+        """
+        Reuse the statement cursor, fetching prefetch_size rows per round trip
+        
+        prefetchrows sizes the rows returned with the execute() response and
+        arraysize every later fetch; the driver defaults of 2 and 100 turn a
+        large report into hundreds of round trips.
+        """
+        prefetch_size = int(self._resolve_credentials()["prefetch_size"])
+        cursor = self._statement_cursor()
+        cursor.prefetchrows = prefetch_size
+        cursor.arraysize = prefetch_size
+        return cursor
+    
+    def _open_connection(self, creds):
+        """Check a connection out of a cx_Oracle session pool"""
+        import cx_Oracle
+        
+        creds["dsn"] = cx_Oracle.makedsn(
+            creds["host"],
+            creds["port"],
+            service_name=creds["service_name"]
+        )
+        connection = self._checkout(
+            lambda: _OraclePool(
+                user=creds["username"],
+                password=creds["password"],
+                dsn=creds["dsn"]
+            )
+        )
+        # Repeated statements reuse their parsed cursor instead of a hard parse
+        connection.stmtcachesize = STATEMENT_CACHE_SIZE
+        return connection
 
 class SQLiteConnector(BaseRelationalConnector):
     """Connector for SQLite databases"""
     
-    def connect(self):
-        """Connect to a SQLite database"""
-        if not self.connection:
-            try:
-                # Match the field name from the updated credential form
-                path = self.credentials.get("path_to_database_file") or self.credentials.get("file_path")
-                
-                if not path:
-                    raise Exception("No database file path provided")
-                
-                self.connection = sqlite3.connect(path)
-                
-                # Create SQLAlchemy engine for schema inspection
-                conn_string = f"sqlite:///{path}"
-                self.engine = create_engine(conn_string)
-                
-            except Exception as e:
-                logger.exception("Error connecting to SQLite")
-                raise Exception(f"Error connecting to SQLite: {str(e)}")
+    _schema_sql = """
+        SELECT m.name, p.name, p.type, p."notnull" = 0
+        FROM sqlite_master m
+        JOIN pragma_table_info(m.name) p
+        WHERE m.type = 'table' AND m.name NOT LIKE 'sqlite_%'
+        ORDER BY m.name, p.cid
+    """
+    _credential_fields = {
+        "path": (("path_to_database_file", "file_path"), None),
+    }
+    _url_template = "sqlite:///{path}"
+    _display_name = "SQLite"
+    _required_credentials = (("path", "No database file path provided"),)
+    
+    def _open_connection(self, creds):
+        """Check a tuned handle out of the SQLite pool for the file"""
+        return self._checkout(lambda: _SQLitePool(creds["path"]))
 
 class RedshiftConnector(BaseRelationalConnector):
     """Connector for Amazon Redshift databases"""
     
-    def connect(self):
-        """Connect to an Amazon Redshift database"""
-        if not self.connection:
-            try:
-                # Support both old and new field names from form
-                db_name = self.credentials.get("database_name") or self.credentials.get("db_name")
-                cluster_id = self.credentials.get("cluster_id") or self.credentials.get("cluster_identifier")
-                region = self.credentials.get("region") or self.credentials.get("aws_region", "us-east-1")
-                port = self.credentials.get("port", 5439)
-                
-                if not db_name:
-                    raise Exception("No database name provided")
-                if not cluster_id:
-                    raise Exception("No cluster identifier provided")
-                
-                # Setup connection using psycopg2
-                self.connection = psycopg2.connect(
-                    dbname=db_name,
-                    user=self.credentials.get("username"),
-                    password=self.credentials.get("password"),
-                    host=f"{cluster_id}.{region}.redshift.amazonaws.com",
-                    port=port
-                )
-                
-                # Create SQLAlchemy engine for schema inspection
-                conn_string = f"redshift+psycopg2://{self.credentials.get('username')}:{self.credentials.get('password')}@{cluster_id}.{region}.redshift.amazonaws.com:{port}/{db_name}"
-                self.engine = create_engine(conn_string)
-                
-            except Exception as e:
-                logger.exception("Error connecting to Redshift")
-                raise Exception(f"Error connecting to Redshift: {str(e)}")
+    _schema_sql = _INFORMATION_SCHEMA_SQL.format(schema="current_schema()")
+    _credential_fields = {
+        "db_name": (("database_name", "db_name"), None),
+        "cluster_id": (("cluster_id", "cluster_identifier"), None),
+        "region": (("region", "aws_region"), "us-east-1"),
+        "port": (("port",), 5439),
+        "username": (("username",), None),
+        "password": (("password",), None),
+    }
+    _host_template = "{cluster_id}.{region}.redshift.amazonaws.com"
+    _url_template = "redshift+psycopg2://{url_username}:{url_password}@{host}:{port}/{db_name}"
+    _display_name = "Redshift"
+    _required_credentials = (
+        ("db_name", "No database name provided"),
+        ("cluster_id", "No cluster identifier provided"),
+    )
+    
+    def _select_cursor(self):
+        """Open a named cursor so psycopg2 streams rows from a server-side portal"""
+        return self.connection.cursor(name=f"sdb_{uuid.uuid4().hex}")
+    
+    def _executemany(self, cursor, query, rows):
+        """Batch rows with psycopg2's execute_values/execute_batch helpers"""
+        _psycopg2_executemany(cursor, query, rows)
+    
+    def _open_connection(self, creds):
+        """Check a connection out of a psycopg2 pool for the cluster"""
+        return self._checkout_psycopg2(
+            dbname=creds["db_name"],
+            user=creds["username"],
+            password=creds["password"],
+            host=creds["host"],
+            port=creds["port"]
+        )
 
 class CloudSQLConnector(BaseRelationalConnector):
     """Connector for Google Cloud SQL databases"""
     
-    def connect(self):
-        """Connect to a Google Cloud SQL database"""
-        if not self.connection:
-            try:
-                # Support both old and new field names from form
-                project_id = self.credentials.get("project_id") or self.credentials.get("gcp_project_id")
-                region = self.credentials.get("region") or self.credentials.get("gcp_region", "us-central1")
-                instance = self.credentials.get("instance") or self.credentials.get("instance_name")
-                db_name = self.credentials.get("database_name") or self.credentials.get("db_name")
-                
-                if not project_id:
-                    raise Exception("No project ID provided")
-                if not instance:
-                    raise Exception("No instance name provided")
-                
-                # Assuming MySQL is being used on Google Cloud SQL
-                self.connection = mysql.connector.connect(
-                    host=f"{project_id}:{region}:{instance}",
-                    user=self.credentials.get("username"),
-                    password=self.credentials.get("password"),
-                    database=db_name
-                )
-                
-                # Create SQLAlchemy engine for schema inspection
-                conn_string = f"mysql+mysqlconnector://{self.credentials.get('username')}:{self.credentials.get('password')}@{project_id}:{region}:{instance}/{db_name}"
-                self.engine = create_engine(conn_string)
-                
-            except Exception as e:
-                logger.exception("Error connecting to Google Cloud SQL")
-                raise Exception(f"Error connecting to Google Cloud SQL: {str(e)}")
+    _schema_sql = _INFORMATION_SCHEMA_SQL.format(schema="DATABASE()")
+    _credential_fields = {
+        "project_id": (("project_id", "gcp_project_id"), None),
+        "region": (("region", "gcp_region"), "us-central1"),
+        "instance": (("instance", "instance_name"), None),
+        "db_name": (("database_name", "db_name"), None),
+        "username": (("username",), None),
+        "password": (("password",), None),
+    }
+    _host_template = "{project_id}:{region}:{instance}"
+    _url_template = "mysql+mysqlconnector://{url_username}:{url_password}@{host}/{db_name}"
+    _display_name = "Google Cloud SQL"
+    _required_credentials = (
+        ("project_id", "No project ID provided"),
+        ("instance", "No instance name provided"),
+    )
+    
+    def _open_connection(self, creds):
+        """Check a connection out of a MySQL pool, assuming MySQL on Google Cloud SQL"""
+        return self._checkout(
+            lambda: _MySQLPool(
+                host=creds["host"],
+                user=creds["username"],
+                password=creds["password"],
+                database=creds["db_name"]
+            )
+        )
 
 class MariaDBConnector(BaseRelationalConnector):
     """Connector for MariaDB databases (using MySQL connector)"""
     
-    def connect(self):
-        """Connect to a MariaDB database"""
-        if not self.connection:
-            try:
-                # Support both old and new field names from form
-                host = self.credentials.get("host") or self.credentials.get("hostname", "localhost")
-                db_name = self.credentials.get("database_name") or self.credentials.get("db_name")
-                port = self.credentials.get("port", 3306)
-                
-                if not db_name:
-                    raise Exception("No database name provided")
-                
-                self.connection = mysql.connector.connect(
-                    host=host,
-                    port=port,
-                    user=self.credentials.get("username"),
-                    password=self.credentials.get("password"),
-                    database=db_name
-                )
-                
-                # Create SQLAlchemy engine for schema inspection
-                conn_string = f"mysql+mysqlconnector://{self.credentials.get('username')}:{self.credentials.get('password')}@{host}:{port}/{db_name}"
-                self.engine = create_engine(conn_string)
-                
-            except Exception as e:
-                logger.exception("Error connecting to MariaDB")
-                raise Exception(f"Error connecting to MariaDB: {str(e)}")
+    _schema_sql = _INFORMATION_SCHEMA_SQL.format(schema="DATABASE()")
+    _credential_fields = {**_HOST_CREDENTIAL_FIELDS, "port": (("port",), 3306)}
+    _url_template = "mysql+mysqlconnector://{url_username}:{url_password}@{host}:{port}/{db_name}"
+    _display_name = "MariaDB"
+    _required_credentials = (("db_name", "No database name provided"),)
+    
+    def _open_connection(self, creds):
+        """Check a connection out of a MySQL pool, which speaks MariaDB's protocol"""
+        return self._checkout(
+            lambda: _MySQLPool(
+                host=creds["host"],
+                port=creds["port"],
+                user=creds["username"],
+                password=creds["password"],
+                database=creds["db_name"]
+            )
+        )
 
 class DB2Connector(BaseRelationalConnector):
     """Connector for IBM Db2 databases"""
     
-    def connect(self):
-        """Connect to an IBM Db2 database"""
-        if not self.connection:
-            try:
-                # Support both old and new field names from form
-                host = self.credentials.get("host") or self.credentials.get("hostname", "localhost")
-                db_name = self.credentials.get("database_name") or self.credentials.get("db_name")
-                port = self.credentials.get("port", 50000)
-                
-                if not db_name:
-                    raise Exception("No database name provided")
-                
-                conn_string = f"DATABASE={db_name};HOSTNAME={host};PORT={port};PROTOCOL=TCPIP;UID={self.credentials.get('username')};PWD={self.credentials.get('password')};"
-                self.connection = ibm_db.connect(conn_string, "", "")
-                
-                # Create SQLAlchemy engine for schema inspection
-                sqlalchemy_conn_string = f"db2+ibm_db://{self.credentials.get('username')}:{self.credentials.get('password')}@{host}:{port}/{db_name}"
-                self.engine = create_engine(sqlalchemy_conn_string)
-                
-            except Exception as e:
-                logger.exception("Error connecting to IBM Db2")
-                raise Exception(f"Error connecting to IBM Db2: {str(e)}")
+    _credential_fields = {**_HOST_CREDENTIAL_FIELDS, "port": (("port",), 50000)}
+    _dsn_template = "DATABASE={db_name};HOSTNAME={host};PORT={port};PROTOCOL=TCPIP;UID={username};PWD={password};"
+    _url_template = "db2+ibm_db://{url_username}:{url_password}@{host}:{port}/{db_name}"
+    _ping_sql = "VALUES 1"
+    _display_name = "IBM Db2"
+    _required_credentials = (("db_name", "No database name provided"),)
+    _schema_sql = """
+        SELECT c.tabname, c.colname, c.typename,
+               CASE WHEN c.nulls = 'Y' THEN 1 ELSE 0 END
+        FROM syscat.columns c
+        JOIN syscat.tables t ON t.tabschema = c.tabschema AND t.tabname = c.tabname
+        WHERE c.tabschema = CURRENT SCHEMA AND t.type = 'T'
+        ORDER BY c.tabname, c.colno
+    """
+    
+    def _catalog_rows(self):
+        """Run the catalog query through ibm_db, which has no DB-API cursor"""
+        import ibm_db
+        
+        stmt = ibm_db.exec_immediate(self.connection, self._schema_sql)
+        rows = []
+        row = ibm_db.fetch_tuple(stmt)
+        while row:
+            rows.append(row)
+            row = ibm_db.fetch_tuple(stmt)
+        return rows
+    
+    def _ping(self):
+        """Round-trip a trivial statement through ibm_db, which has no DB-API cursor"""
+        import ibm_db
+        
+        ibm_db.exec_immediate(self.connection, self._ping_sql)
+    
+    def _open_connection(self, creds):
+        """Open an ibm_db connection from the DSN template"""
+        import ibm_db
+        
+        return ibm_db.connect(self._dsn_template.format(**creds), "", "")
@@ -1,27 +1,118 @@
+import copy
 import logging
 import json
 import os
-from decimal import Decimal
+import time
+import uuid
+from urllib.parse import quote_plus
+from itertools import groupby
+from operator import itemgetter
+
+from .relational import (
+    FETCH_CHUNK_SIZE,
+    POOL_MAX_CONNECTIONS,
+    SCHEMA_CACHE_TTL,
+    _CURSOR_KEYWORDS,
+    _DDL_KEYWORDS,
+    _RESULT_KEYWORDS,
+    _acquire_query_slot,
+    _copy_query_out,
+    _copy_rows_in,
+    _connection_pools,
+    _connection_pools_lock,
+    _get_engine,
+    _leading_keyword,
+    _psycopg2_executemany,
+    _psycopg2_pool_key,
+    _schema_cache,
+    _schema_cache_lock,
+)
 
 # Import PostgreSQL database libraries with try/except to handle missing dependencies
 try:
     import psycopg2
-    from sqlalchemy import create_engine
+    import psycopg2.extensions
+    import psycopg2.pool
+    
+    # Parses NUMERIC values straight to float with psycopg2's C float caster,
+    # instead of building a Decimal per value and converting it afterwards
+    _NUMERIC_AS_FLOAT = psycopg2.extensions.new_type(
+        psycopg2.extensions.DECIMAL.values, "NUMERIC_AS_FLOAT", psycopg2.extensions.FLOAT
+    )
 except ImportError:
     psycopg2 = None
-    create_engine = None
 
 # Configure logging
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
+# Every hypertable with its columns in one round trip, ordered for grouping
+_HYPERTABLE_COLUMNS_SQL = """
+    SELECT h.hypertable_schema, h.hypertable_name, h.time_column_name,
+           c.column_name, c.data_type
+    FROM _timescaledb_catalog.hypertable h
+    LEFT JOIN information_schema.columns c
+        ON c.table_schema = h.hypertable_schema AND c.table_name = h.hypertable_name
+    ORDER BY h.hypertable_schema, h.hypertable_name, c.ordinal_position
+"""
+
 class TimescaleDBConnector:
-    """Connector for TimescaleDB time-series databases"""
+    """
+    Connector for TimescaleDB time-series databases
+    
+    Connections come from a psycopg2 pool shared by all connectors with the
+    same credentials and go back to it after each call.
+    """
     
     def __init__(self, credentials):
         self.credentials = credentials
         self.client = None
-        self.engine = None
+        self._engine = None
+        self._pool = None
+        self._slot = None
+    
+    @property
+    def engine(self):
+        """
+        Shared SQLAlchemy engine for the credentials, looked up on first access
+        
+        Queries and schema reads go through psycopg2, so the connection URL is
+        only built here, when a caller actually asks for the engine.
+        """
+        if self._engine is None:
+            conn_string = self.credentials.get("connection_string")
+            if not conn_string:
+                conn_string = "postgresql://{}:{}@{}:{}/{}".format(
+                    quote_plus(str(self.credentials.get("user") or "")),
+                    quote_plus(str(self.credentials.get("password") or "")),
+                    self.credentials.get("host", "localhost"),
+                    self.credentials.get("port", 5432),
+                    self.credentials.get("database")
+                )
+            self._engine = _get_engine(conn_string)
+        return self._engine
+    
+    def _pool_key(self):
+        """Build the key identifying the shared pool for this connector's credentials"""
+        return (type(self).__name__, tuple(sorted((k, str(v)) for k, v in self.credentials.items())))
+    
+    def _checkout(self, *args, **kwargs):
+        """Check a connection out of the psycopg2 pool shared with other connectors on the same DSN"""
+        key = _psycopg2_pool_key(args, kwargs)
+        slot = _acquire_query_slot(key)
+        try:
+            with _connection_pools_lock:
+                pool = _connection_pools.get(key)
+                if pool is None:
+                    pool = psycopg2.pool.ThreadedConnectionPool(1, POOL_MAX_CONNECTIONS, *args, **kwargs)
+                    _connection_pools[key] = pool
+            
+            self.client = pool.getconn()
+        except Exception:
+            slot.release()
+            raise
+        
+        self._pool = pool
+        self._slot = slot
     
     def connect(self):
         """Connect to a TimescaleDB database"""
@@ -29,7 +120,7 @@ class TimescaleDBConnector:
             try:
                 # Support both direct connection string and individual parameters
                 if self.credentials.get("connection_string"):
-                    self.client = psycopg2.connect(self.credentials.get("connection_string"))
+                    self._checkout(self.credentials.get("connection_string"))
                 else:
                     host = self.credentials.get("host", "localhost")
                     port = self.credentials.get("port", 5432)
@@ -40,7 +131,7 @@ class TimescaleDBConnector:
                     if not database:
                         raise Exception("No database name provided")
                     
-                    self.client = psycopg2.connect(
+                    self._checkout(
                         host=host,
                         port=port,
                         dbname=database,
@@ -48,28 +139,34 @@ class TimescaleDBConnector:
                         password=password
                     )
                 
-                # Create SQLAlchemy engine for schema inspection
-                if self.credentials.get("connection_string"):
-                    conn_string = self.credentials.get("connection_string")
-                else:
-                    conn_string = f"postgresql://{user}:{password}@{host}:{port}/{database}"
-                
-                self.engine = create_engine(conn_string)
-                
             except Exception as e:
                 logger.exception("Error connecting to TimescaleDB")
                 raise Exception(f"Error connecting to TimescaleDB: {str(e)}")
     
+    def _rollback(self):
+        """Roll back a failed statement so the connection goes back to the pool clean"""
+        if self.client:
+            try:
+                self.client.rollback()
+            except Exception as e:
+                logger.error("Error rolling back: %s", e)
+    
     def disconnect(self):
-        """Disconnect from the TimescaleDB database"""
+        """Return the connection to the shared pool"""
         if self.client:
             try:
-                self.client.close()
+                if self._pool is not None:
+                    self._pool.putconn(self.client)
+                else:
+                    self.client.close()
             except Exception as e:
-                logger.error(f"Error disconnecting: {str(e)}")
+                logger.error("Error disconnecting: %s", e)
             finally:
                 self.client = None
-                self.engine = None
+                self._pool = None
+                if self._slot is not None:
+                    self._slot.release()
+                    self._slot = None
     
     def test_connection(self):
         """Test the connection to the TimescaleDB database"""
@@ -84,38 +181,51 @@ class TimescaleDBConnector:
         finally:
             self.disconnect()
     
+    def refresh_schema(self):
+        """Drop the cached schema so the next get_schema() reads it from the database"""
+        with _schema_cache_lock:
+            _schema_cache.pop(self._pool_key(), None)
+    
     def get_schema(self):
-        """Get the schema of the TimescaleDB database"""
+        """
+        Get the schema of the TimescaleDB database
+        
+        Schemas are cached per credentials for SCHEMA_CACHE_TTL seconds and
+        dropped when execute_query() runs DDL.
+        """
+        key = self._pool_key()
+        with _schema_cache_lock:
+            cached = _schema_cache.get(key)
+        if cached and time.monotonic() - cached[0] < SCHEMA_CACHE_TTL:
+            return copy.deepcopy(cached[1])
+        
+        # Callers may edit the schema they get back, so the cache keeps its own copy
+        schema_info = self._read_schema()
+        if "error" not in schema_info:
+            with _schema_cache_lock:
+                _schema_cache[key] = (time.monotonic(), copy.deepcopy(schema_info))
+        return schema_info
+    
+    def _read_schema(self):
+        """Read the hypertables and their columns from the database"""
         try:
             self.connect()
             
             cursor = self.client.cursor()
-            
-            # Get all hypertables
-            cursor.execute("""
-                SELECT hypertable_schema, hypertable_name, time_column_name
-                FROM _timescaledb_catalog.hypertable
-            """)
+            cursor.execute(_HYPERTABLE_COLUMNS_SQL)
             
             hypertables = []
-            for row in cursor.fetchall():
-                schema, table, time_column = row
-                
-                # Get columns for this hypertable
-                cursor.execute(f"""
-                    SELECT column_name, data_type
-                    FROM information_schema.columns
-                    WHERE table_schema = %s AND table_name = %s
-                """, (schema, table))
-                
-                columns = []
-                for col_row in cursor.fetchall():
-                    col_name, data_type = col_row
-                    columns.append({
+            for (schema, table, time_column), rows in groupby(cursor.fetchall(), key=itemgetter(0, 1, 2)):
+                # The LEFT JOIN yields one NULL column row for a hypertable without columns
+                columns = [
+                    {
                         "name": col_name,
                         "type": data_type,
                         "is_time_column": col_name == time_column
-                    })
+                    }
+                    for _, _, _, col_name, data_type in rows
+                    if col_name is not None
+                ]
                 
                 hypertables.append({
                     "schema": schema,
@@ -136,12 +246,19 @@ class TimescaleDBConnector:
         finally:
             self.disconnect()
     
-    def execute_query(self, query):
+    def execute_query(self, query, max_rows=None, result_format="records"):
         """
         Execute a SQL query against TimescaleDB
         
+        SELECT results stream from a server-side cursor in FETCH_CHUNK_SIZE
+        chunks, so max_rows stops the read without pulling the rest of the
+        result set over the network.
+        
         Args:
             query (str): A SQL query string
+            max_rows (int, optional): Maximum number of rows to return for SELECT queries
+            result_format (str): "records" for a list of row dicts, or "columnar"
+                for a dict of column name -> list of values
             
         Returns:
             tuple: (result, success, error_message)
@@ -149,35 +266,138 @@ class TimescaleDBConnector:
         try:
             self.connect()
             
-            cursor = self.client.cursor()
-            cursor.execute(query)
+            keyword = _leading_keyword(query)
             
-            # Check if the query is a SELECT query
-            if query.strip().upper().startswith("SELECT"):
-                columns = [col[0] for col in cursor.description]
-                results = []
+            # Check if the query returns rows; CTEs and VALUES lists count, and
+            # SHOW or EXPLAIN can't be declared as a server-side cursor
+            if keyword in _RESULT_KEYWORDS:
+                if keyword in _CURSOR_KEYWORDS:
+                    cursor = self.client.cursor(name=f"sdb_{uuid.uuid4().hex}")
+                else:
+                    cursor = self.client.cursor()
+                # Scoped to the cursor, since the pooled connection is shared
+                # with PostgreSQL connectors that expect Decimals
+                psycopg2.extensions.register_type(_NUMERIC_AS_FLOAT, cursor)
+                cursor.execute(query)
+                
+                columnar = result_format == "columnar"
+                results = None if columnar else []
+                filled = 0
+                columns = None
+                while max_rows is None or filled < max_rows:
+                    chunk_size = FETCH_CHUNK_SIZE
+                    if max_rows is not None:
+                        chunk_size = min(chunk_size, max_rows - filled)
+                    
+                    rows = cursor.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    
+                    # Named cursors only describe their columns after the first fetch
+                    if columns is None:
+                        columns = [col[0] for col in cursor.description]
+                    
+                    if columnar:
+                        if results is None:
+                            results = [[] for _ in columns]
+                        for column_values, chunk_values in zip(results, zip(*rows)):
+                            column_values.extend(chunk_values)
+                    else:
+                        results.extend(dict(zip(columns, row)) for row in rows)
+                    filled += len(rows)
                 
-                for row in cursor.fetchall():
-                    # Create a row dict with proper type conversions
-                    row_dict = {}
-                    for i, value in enumerate(row):
-                        col_name = columns[i]
-                        # Handle Decimal values by converting to float
-                        if isinstance(value, Decimal):
-                            row_dict[col_name] = float(value)
-                        else:
-                            row_dict[col_name] = value
-                    results.append(row_dict)
+                if columnar:
+                    columns = [col[0] for col in cursor.description or ()]
+                    return dict(zip(columns, results or [[] for _ in columns])), True, None
                 
                 return results, True, None
             else:
                 # For non-SELECT queries
+                cursor = self.client.cursor()
+                cursor.execute(query)
                 affected_rows = cursor.rowcount
                 self.client.commit()
+                if keyword in _DDL_KEYWORDS:
+                    self.refresh_schema()
                 return {"affected_rows": affected_rows}, True, None
                 
         except Exception as e:
-            logger.exception(f"Error executing TimescaleDB query: {query}")
+            logger.exception("Error executing TimescaleDB query: %s", query)
             return None, False, f"Error executing query: {str(e)}"
         finally:
-            self.disconnect()
\ No newline at end of file
+            self.disconnect()
+    
+    def execute_many(self, query, rows):
+        """
+        Execute a parameterized DML statement once for each row in a single batch
+        
+        An INSERT with a single VALUES %s placeholder is folded into multi-row
+        statements by psycopg2's execute_values.
+        
+        Args:
+            query (str): The statement, using psycopg2's %s parameter style
+            rows (list): A sequence of parameter tuples
+            
+        Returns:
+            tuple: (result, success, error_message)
+        """
+        try:
+            self.connect()
+            
+            cursor = self.client.cursor()
+            _psycopg2_executemany(cursor, query, rows)
+            affected_rows = cursor.rowcount
+            self.client.commit()
+            return {"affected_rows": affected_rows}, True, None
+            
+        except Exception as e:
+            logger.exception("Error executing TimescaleDB batch: %s", query)
+            self._rollback()
+            return None, False, f"Error executing batch: {str(e)}"
+        finally:
+            self.disconnect()
+    
+    def copy_rows(self, table, columns, rows):
+        """
+        Bulk-load rows into a table or hypertable with COPY FROM STDIN
+        
+        Args:
+            table (str): The target table
+            columns (list): The target column names, in row order
+            rows (list): A sequence of value tuples
+            
+        Returns:
+            tuple: (result, success, error_message)
+        """
+        try:
+            self.connect()
+            
+            affected_rows = _copy_rows_in(self.client.cursor(), table, columns, rows)
+            self.client.commit()
+            return {"affected_rows": affected_rows}, True, None
+            
+        except Exception as e:
+            logger.exception("Error copying rows into %s", table)
+            return None, False, f"Error copying rows: {str(e)}"
+        finally:
+            self.disconnect()
+    
+    def export_csv(self, query):
+        """
+        Export the result of a SELECT as CSV with COPY TO STDOUT
+        
+        Args:
+            query (str): The SELECT query to export
+            
+        Returns:
+            tuple: (csv_bytes, success, error_message)
+        """
+        try:
+            self.connect()
+            return _copy_query_out(self.client.cursor(), query), True, None
+            
+        except Exception as e:
+            logger.exception("Error exporting TimescaleDB query: %s", query)
+            return None, False, f"Error exporting query: {str(e)}"
+        finally:
+            self.disconnect()
@@ -1,24 +1,30 @@
+import atexit
+import copy
 import logging
 import json
 import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 import requests
+from requests.adapters import HTTPAdapter
 from requests.auth import HTTPBasicAuth
+from urllib3.util.retry import Retry
 from decimal import Decimal
 from urllib.parse import urljoin
 
+from utils import json_loads
+from .relational import FETCH_CHUNK_SIZE, SCHEMA_CACHE_TTL, _schema_cache, _schema_cache_lock
+
 # Import time-series database libraries with try/except to handle missing dependencies
 try:
     from influxdb_client import InfluxDBClient
-    from influxdb_client.client.write_api import SYNCHRONOUS
+    from influxdb_client.client.write_api import SYNCHRONOUS, WriteOptions
 except ImportError:
     InfluxDBClient = None
 
-try:
-    import psycopg2
-    from sqlalchemy import create_engine
-except ImportError:
-    psycopg2 = None
-
 try:
     import qpython
     from qpython import qconnection
@@ -26,9 +32,60 @@ except ImportError:
     qpython = None
 
 # Configure logging
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
+# Batching for InfluxDB writes: points are sent once INFLUX_BATCH_SIZE have
+# queued up or every INFLUX_FLUSH_INTERVAL milliseconds
+INFLUX_BATCH_SIZE = 5000
+INFLUX_FLUSH_INTERVAL = 1000
+
+# Threads listing measurements in parallel, one Flux query per bucket
+INFLUX_SCHEMA_MAX_WORKERS = 16
+
+# InfluxDB clients keyed by server and auth. The client is thread-safe and
+# keeps up to INFLUX_POOL_SIZE HTTP connections alive in its urllib3 pool, so
+# one per server is shared by all connectors.
+INFLUX_POOL_SIZE = 50
+_influx_clients = {}
+_influx_clients_lock = threading.Lock()
+
+# One keep-alive session for every Prometheus request
+_prometheus_session = requests.Session()
+_prometheus_adapter = HTTPAdapter(
+    pool_connections=16, pool_maxsize=64, max_retries=Retry(total=2, backoff_factor=0.1)
+)
+_prometheus_session.mount("http://", _prometheus_adapter)
+_prometheus_session.mount("https://", _prometheus_adapter)
+
+# Successful PromQL results, kept for PROMETHEUS_RESULT_TTL seconds and capped
+# at PROMETHEUS_RESULT_CACHE_SIZE entries, least recently used first out.
+# Queries without an evaluation time are keyed by PROMETHEUS_TIME_BUCKET-second
+# slices of the clock, so dashboards refreshing together share one result.
+PROMETHEUS_RESULT_TTL = 10
+PROMETHEUS_RESULT_CACHE_SIZE = 1024
+PROMETHEUS_TIME_BUCKET = 5
+_prometheus_results = OrderedDict()
+_prometheus_results_lock = threading.Lock()
+
+# Queries execute_queries() sends to Prometheus at once
+PROMETHEUS_MAX_CONCURRENT = 16
+
+def _close_influx_clients():
+    """Close the shared InfluxDB clients, flushing anything they still hold"""
+    with _influx_clients_lock:
+        clients = list(_influx_clients.values())
+        _influx_clients.clear()
+    
+    for client, _, _, batch_write_api in clients:
+        try:
+            # Closing the batching writer flushes the points it still holds
+            batch_write_api.close()
+            client.close()
+        except Exception as e:
+            logger.error("Error closing InfluxDB client: %s", e)
+
+atexit.register(_close_influx_clients)
+
 class BaseTimeSeriesConnector:
     """Base class for time-series database connectors"""
     
@@ -46,7 +103,7 @@ class BaseTimeSeriesConnector:
             try:
                 self.client.close()
             except Exception as e:
-                logger.error(f"Error disconnecting: {str(e)}")
+                logger.error("Error disconnecting: %s", e)
             finally:
                 self.client = None
     
@@ -60,8 +117,37 @@ class BaseTimeSeriesConnector:
         finally:
             self.disconnect()
     
+    def _schema_key(self):
+        """Build the key identifying this connector's credentials in the schema cache"""
+        return (type(self).__name__, tuple(sorted((k, str(v)) for k, v in self.credentials.items())))
+    
+    def refresh_schema(self):
+        """Drop the cached schema so the next get_schema() reads it from the server"""
+        with _schema_cache_lock:
+            _schema_cache.pop(self._schema_key(), None)
+    
     def get_schema(self):
-        """Get the schema of the time-series database"""
+        """
+        Get the schema of the time-series database
+        
+        Schemas are cached per credentials for SCHEMA_CACHE_TTL seconds; call
+        refresh_schema() to see changes sooner.
+        """
+        key = self._schema_key()
+        with _schema_cache_lock:
+            cached = _schema_cache.get(key)
+        if cached and time.monotonic() - cached[0] < SCHEMA_CACHE_TTL:
+            return copy.deepcopy(cached[1])
+        
+        # Callers may edit the schema they get back, so the cache keeps its own copy
+        schema_info = self._read_schema()
+        if "error" not in schema_info:
+            with _schema_cache_lock:
+                _schema_cache[key] = (time.monotonic(), copy.deepcopy(schema_info))
+        return schema_info
+    
+    def _read_schema(self):
+        """Read the schema from the server"""
         return {"message": "Schema retrieval is limited for time-series databases"}
     
     def execute_query(self, query):
@@ -77,11 +163,30 @@ class BaseTimeSeriesConnector:
         raise NotImplementedError("Subclasses must implement execute_query()")
 
 class InfluxDBConnector(BaseTimeSeriesConnector):
-    """Connector for InfluxDB time-series databases"""
+    """
+    Connector for InfluxDB time-series databases
+    
+    The client is shared by all connectors with the same credentials and stays
+    open until the process exits, so sequential queries reuse its connections.
+    Writes are batched in the background unless the "write_sync" operation
+    asks to wait for the server.
+    """
     
     def connect(self):
         """Connect to an InfluxDB time-series database"""
         if not self.client:
+            # Only what the client itself is built from, so connectors that
+            # differ in bucket alone still share one connection pool
+            key = tuple(
+                str(self.credentials.get(name))
+                for name in ("url", "token", "username", "password", "org")
+            )
+            with _influx_clients_lock:
+                shared = _influx_clients.get(key)
+            if shared:
+                self.client, self.query_api, self.write_api, self.batch_write_api = shared
+                return
+            
             try:
                 # Get URL from credentials
                 url = self.credentials.get("url", "http://localhost:8086")
@@ -95,23 +200,65 @@ class InfluxDBConnector(BaseTimeSeriesConnector):
                 username = self.credentials.get("username")
                 password = self.credentials.get("password")
                 
+                # Flux responses are CSV and compress well, so ask for them gzipped
                 if token:
-                    self.client = InfluxDBClient(url=url, token=token, org=org)
+                    self.client = InfluxDBClient(
+                        url=url, token=token, org=org, enable_gzip=True,
+                        connection_pool_maxsize=INFLUX_POOL_SIZE
+                    )
                 elif username and password:
                     # For InfluxDB 1.x compatibility
-                    self.client = InfluxDBClient(url=url, username=username, password=password, org=org)
+                    self.client = InfluxDBClient(
+                        url=url, username=username, password=password, org=org, enable_gzip=True,
+                        connection_pool_maxsize=INFLUX_POOL_SIZE
+                    )
                 else:
                     raise Exception("Either token or username/password must be provided")
                 
                 self.query_api = self.client.query_api()
                 self.write_api = self.client.write_api(write_options=SYNCHRONOUS)
+                self.batch_write_api = self.client.write_api(write_options=WriteOptions(
+                    batch_size=INFLUX_BATCH_SIZE,
+                    flush_interval=INFLUX_FLUSH_INTERVAL,
+                    jitter_interval=200,
+                    retry_interval=5000,
+                    max_retries=3,
+                    max_retry_delay=30000,
+                    exponential_base=2
+                ))
                 
             except Exception as e:
+                self.client = None
                 logger.exception("Error connecting to InfluxDB")
                 raise Exception(f"Error connecting to InfluxDB: {str(e)}")
+            
+            with _influx_clients_lock:
+                shared = _influx_clients.setdefault(
+                    key, (self.client, self.query_api, self.write_api, self.batch_write_api)
+                )
+            
+            # Another thread connected first, so use its client instead
+            if shared[0] is not self.client:
+                self.batch_write_api.close()
+                self.client.close()
+                self.client, self.query_api, self.write_api, self.batch_write_api = shared
     
-    def get_schema(self):
-        """Get the buckets and measurements in the InfluxDB database"""
+    def disconnect(self):
+        """Flush the batched points and let go of the shared client without closing it"""
+        if self.client and getattr(self, "batch_write_api", None) is not None:
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error("Error flushing InfluxDB writes: %s", e)
+        self.client = None
+    
+    def flush(self):
+        """Send any batched points that haven't been written yet"""
+        self.connect()
+        self.batch_write_api.flush()
+    
+    def _read_schema(self):
+        """Read the buckets and measurements in the InfluxDB database"""
         try:
             self.connect()
             
@@ -125,29 +272,21 @@ class InfluxDBConnector(BaseTimeSeriesConnector):
             buckets_api = self.client.buckets_api()
             buckets = buckets_api.find_buckets().buckets
             
-            for bucket in buckets:
-                bucket_info = {
+            # Each bucket's measurements take a Flux query, so run them side by side
+            if buckets:
+                with ThreadPoolExecutor(max_workers=min(INFLUX_SCHEMA_MAX_WORKERS, len(buckets))) as executor:
+                    bucket_measurements = list(executor.map(
+                        lambda bucket: self._bucket_measurements(bucket, org), buckets
+                    ))
+            else:
+                bucket_measurements = []
+            
+            for bucket, measurements in zip(buckets, bucket_measurements):
+                schema_info["buckets"].append({
                     "name": bucket.name,
                     "id": bucket.id,
-                    "measurements": []
-                }
-                
-                # For InfluxDB 2.x, we need to use Flux to get measurements
-                # This might be resource-intensive for large datasets
-                try:
-                    query = f'import "influxdata/influxdb/schema"\n\nschema.measurements(bucket: "{bucket.name}")'
-                    result = self.query_api.query(query, org=org)
-                    
-                    measurements = []
-                    for table in result:
-                        for record in table.records:
-                            measurements.append(record.values.get("_value"))
-                    
-                    bucket_info["measurements"] = measurements
-                except Exception as e:
-                    logger.warning(f"Error getting measurements for bucket {bucket.name}: {str(e)}")
-                
-                schema_info["buckets"].append(bucket_info)
+                    "measurements": measurements
+                })
             
             return schema_info
             
@@ -157,10 +296,66 @@ class InfluxDBConnector(BaseTimeSeriesConnector):
         finally:
             self.disconnect()
     
+    def _bucket_measurements(self, bucket, org):
+        """
+        List the measurements in one bucket
+        
+        A failing bucket is logged and reported with no measurements, so it
+        doesn't abort the rest of the schema read.
+        """
+        # For InfluxDB 2.x, we need to use Flux to get measurements
+        # This might be resource-intensive for large datasets
+        try:
+            query = f'import "influxdata/influxdb/schema"\n\nschema.measurements(bucket: "{bucket.name}")'
+            result = self.query_api.query(query, org=org)
+            
+            measurements = []
+            for table in result:
+                for record in table.records:
+                    measurements.append(record.values.get("_value"))
+            return measurements
+        except Exception as e:
+            logger.warning("Error getting measurements for bucket %s: %s", bucket.name, e)
+            return []
+    
+    def _flux_records(self, flux_query, org):
+        """Yield each record's values as the Flux response is parsed, without building tables"""
+        for record in self.query_api.query_stream(flux_query, org=org):
+            yield record.values
+    
+    def stream_query(self, flux_query):
+        """
+        Execute a Flux query and yield its records one chunk at a time
+        
+        The response is parsed as it arrives, so only one chunk of records is
+        held in memory at once.
+        
+        Args:
+            flux_query (str): The Flux query to execute
+            
+        Yields:
+            list: Up to FETCH_CHUNK_SIZE record dicts
+        """
+        try:
+            self.connect()
+            
+            records = self._flux_records(flux_query, self.credentials.get("org"))
+            while True:
+                chunk = list(islice(records, FETCH_CHUNK_SIZE))
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            self.disconnect()
+    
     def execute_query(self, query):
         """
         Execute a Flux query against InfluxDB
         
+        A "write" operation is acknowledged once its points are queued for the
+        batching writer, before the server has received them, and is flushed
+        when the connector disconnects. Use "write_sync" to wait for the server.
+        
         Args:
             query (str): Either a Flux query string or a JSON string with operation details
             
@@ -172,23 +367,28 @@ class InfluxDBConnector(BaseTimeSeriesConnector):
             
             org = self.credentials.get("org")
             
+            # Plain Flux never starts with a brace, so skip the JSON parse
+            if not query.lstrip().startswith("{"):
+                return list(self._flux_records(query, org)), True, None
+            
             # Check if the query is a JSON string for write operations
             try:
-                query_obj = json.loads(query)
+                query_obj = json_loads(query)
                 operation = query_obj.get("operation")
                 
-                if operation == "write":
+                if operation in ("write", "write_sync"):
                     bucket = query_obj.get("bucket")
                     data = query_obj.get("data")
                     
                     if not bucket or not data:
                         return None, False, "Write operation requires bucket and data"
                     
-                    # Data can be a list of points or a single point
-                    if isinstance(data, list):
+                    # Data can be a list of points or a single point. Plain writes
+                    # are queued for the next batch; write_sync waits for the server
+                    if operation == "write_sync":
                         self.write_api.write(bucket=bucket, record=data)
                     else:
-                        self.write_api.write(bucket=bucket, record=data)
+                        self.batch_write_api.write(bucket=bucket, record=data)
                     
                     return {"status": "success"}, True, None
                     
@@ -198,33 +398,17 @@ class InfluxDBConnector(BaseTimeSeriesConnector):
                     if not flux_query:
                         return None, False, "Query operation requires flux_query"
                     
-                    result = self.query_api.query(flux_query, org=org)
-                    
-                    # Convert result to a list of dictionaries
-                    results = []
-                    for table in result:
-                        for record in table.records:
-                            results.append(record.values)
-                    
-                    return results, True, None
+                    return list(self._flux_records(flux_query, org)), True, None
                     
                 else:
                     return None, False, f"Unsupported operation: {operation}"
                     
             except json.JSONDecodeError:
                 # If not JSON, assume it's a Flux query
-                result = self.query_api.query(query, org=org)
-                
-                # Convert result to a list of dictionaries
-                results = []
-                for table in result:
-                    for record in table.records:
-                        results.append(record.values)
-                
-                return results, True, None
+                return list(self._flux_records(query, org)), True, None
                 
         except Exception as e:
-            logger.exception(f"Error executing InfluxDB query: {query}")
+            logger.exception("Error executing InfluxDB query: %s", query)
             return None, False, f"Error executing query: {str(e)}"
         finally:
             self.disconnect()
@@ -237,27 +421,37 @@ class PrometheusConnector(BaseTimeSeriesConnector):
         super().__init__(credentials)
         self.base_url = None
         self.auth = None
+        self._config_url = None
+        self._metrics_url = None
+        self._query_url = None
     
     def connect(self):
         """Connect to a Prometheus server"""
         try:
-            # Support both URL field and hostname/port fields
-            if self.credentials.get("url"):
-                self.base_url = self.credentials.get("url")
-            else:
-                hostname = self.credentials.get("hostname", "localhost")
-                port = self.credentials.get("port", 9090)
-                self.base_url = f"http://{hostname}:{port}"
-            
-            # Set up authentication if provided
-            username = self.credentials.get("username")
-            password = self.credentials.get("password")
-            if username and password:
-                self.auth = HTTPBasicAuth(username, password)
+            # The server address and endpoints only depend on the credentials,
+            # so they're worked out on the first connect and kept afterwards
+            if self.base_url is None:
+                # Support both URL field and hostname/port fields
+                if self.credentials.get("url"):
+                    base_url = self.credentials.get("url")
+                else:
+                    hostname = self.credentials.get("hostname", "localhost")
+                    port = self.credentials.get("port", 9090)
+                    base_url = f"http://{hostname}:{port}"
+                
+                # Set up authentication if provided
+                username = self.credentials.get("username")
+                password = self.credentials.get("password")
+                if username and password:
+                    self.auth = HTTPBasicAuth(username, password)
+                
+                self._config_url = urljoin(base_url, "/api/v1/status/config")
+                self._metrics_url = urljoin(base_url, "/api/v1/label/__name__/values")
+                self._query_url = urljoin(base_url, "/api/v1/query")
+                self.base_url = base_url
             
             # Test connection
-            url = urljoin(self.base_url, "/api/v1/status/config")
-            response = requests.get(url, auth=self.auth)
+            response = _prometheus_session.get(self._config_url, auth=self.auth)
             response.raise_for_status()
             
             self.client = True  # Just a flag to indicate connection is established
@@ -268,21 +462,18 @@ class PrometheusConnector(BaseTimeSeriesConnector):
             raise Exception(f"Error connecting to Prometheus: {str(e)}")
     
     def disconnect(self):
-        """Disconnect from Prometheus"""
+        """Disconnect from Prometheus, keeping the resolved endpoints for the next call"""
         self.client = None
-        self.base_url = None
-        self.auth = None
     
-    def get_schema(self):
-        """Get metadata from Prometheus"""
+    def _read_schema(self):
+        """Read the metric names from Prometheus"""
         try:
             self.connect()
             
             # Get list of metrics
-            url = urljoin(self.base_url, "/api/v1/label/__name__/values")
-            response = requests.get(url, auth=self.auth)
+            response = _prometheus_session.get(self._metrics_url, auth=self.auth)
             response.raise_for_status()
-            data = response.json()
+            data = json_loads(response.content)
             
             metrics = data.get("data", [])
             
@@ -297,6 +488,42 @@ class PrometheusConnector(BaseTimeSeriesConnector):
         finally:
             self.disconnect()
     
+    def _instant_query(self, params):
+        """
+        Run an instant query, answering repeats from the result cache
+        
+        Args:
+            params (dict): The /api/v1/query parameters
+            
+        Returns:
+            dict: The decoded Prometheus response
+        """
+        key = (
+            self.base_url,
+            self.credentials.get("username"),
+            params["query"],
+            params.get("time") or int(time.time() // PROMETHEUS_TIME_BUCKET),
+            params.get("timeout")
+        )
+        with _prometheus_results_lock:
+            cached = _prometheus_results.get(key)
+            if cached and time.monotonic() - cached[0] < PROMETHEUS_RESULT_TTL:
+                _prometheus_results.move_to_end(key)
+                return cached[1]
+        
+        response = _prometheus_session.get(self._query_url, params=params, auth=self.auth)
+        response.raise_for_status()
+        result = json_loads(response.content)
+        
+        # Only successful results are worth serving again
+        if result.get("status") == "success":
+            with _prometheus_results_lock:
+                _prometheus_results[key] = (time.monotonic(), result)
+                _prometheus_results.move_to_end(key)
+                while len(_prometheus_results) > PROMETHEUS_RESULT_CACHE_SIZE:
+                    _prometheus_results.popitem(last=False)
+        return result
+    
     def execute_query(self, query):
         """
         Execute a PromQL query against Prometheus
@@ -309,35 +536,71 @@ class PrometheusConnector(BaseTimeSeriesConnector):
         """
         try:
             self.connect()
+            return self._run_query(query)
+        except Exception as e:
+            logger.exception("Error executing Prometheus query: %s", query)
+            return None, False, f"Error executing query: {str(e)}"
+        finally:
+            self.disconnect()
+    
+    def execute_queries(self, queries):
+        """
+        Execute several independent PromQL queries concurrently
+        
+        The queries run side by side over the shared keep-alive session, so a
+        dashboard's panels take about as long as the slowest one.
+        
+        Args:
+            queries (list): PromQL query strings or JSON with query details
             
-            # Check if query is a JSON with operation details
-            try:
-                query_obj = json.loads(query)
-                promql_query = query_obj.get("query")
-                time = query_obj.get("time")
-                timeout = query_obj.get("timeout")
-                
-                # Use the query field if provided, otherwise use the raw query string
-                if promql_query:
-                    query = promql_query
-                
-            except json.JSONDecodeError:
-                # If not JSON, assume it's a direct PromQL query
-                pass
+        Returns:
+            list: One (result, success, error_message) tuple per query, in order
+        """
+        if not queries:
+            return []
+        
+        try:
+            self.connect()
+            with ThreadPoolExecutor(max_workers=min(PROMETHEUS_MAX_CONCURRENT, len(queries))) as executor:
+                return list(executor.map(self._run_query, queries))
+        except Exception as e:
+            logger.exception("Error executing Prometheus queries")
+            return [(None, False, f"Error executing query: {str(e)}")] * len(queries)
+        finally:
+            self.disconnect()
+    
+    def _run_query(self, query):
+        """Execute one PromQL query on the connected server"""
+        try:
+            eval_time = None
+            timeout = None
+            
+            # Check if query is a JSON with operation details; raw PromQL
+            # doesn't start with a brace, so it skips the parse entirely
+            if query.lstrip().startswith("{"):
+                try:
+                    query_obj = json_loads(query)
+                    promql_query = query_obj.get("query")
+                    eval_time = query_obj.get("time")
+                    timeout = query_obj.get("timeout")
+                    
+                    # Use the query field if provided, otherwise use the raw query string
+                    if promql_query:
+                        query = promql_query
+                    
+                except json.JSONDecodeError:
+                    # Not JSON after all, so treat it as a direct PromQL query
+                    pass
             
             # Build query parameters
             params = {"query": query}
-            if time:
-                params["time"] = time
+            if eval_time:
+                params["time"] = eval_time
             if timeout:
                 params["timeout"] = timeout
             
             # Execute query
-            url = urljoin(self.base_url, "/api/v1/query")
-            response = requests.get(url, params=params, auth=self.auth)
-            response.raise_for_status()
-            
-            result = response.json()
+            result = self._instant_query(params)
             
             # Check for errors
             if result.get("status") != "success":
@@ -348,7 +611,5 @@ class PrometheusConnector(BaseTimeSeriesConnector):
             return result.get("data", {}), True, None
             
         except Exception as e:
-            logger.exception(f"Error executing Prometheus query: {query}")
+            logger.exception("Error executing Prometheus query: %s", query)
             return None, False, f"Error executing query: {str(e)}"
-        finally:
-            self.disconnect()
@@ -1,19 +1,52 @@
+import os
+import secrets
+import threading
 import uuid
 from datetime import datetime
+from functools import lru_cache
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy import Column, String, DateTime, Text, Boolean, ForeignKey, Integer
-from sqlalchemy.orm import relationship
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy import JSON, Column, String, DateTime, Text, Boolean, ForeignKey, Index, Integer, func, select
+from sqlalchemy.orm import column_property, relationship
 from werkzeug.security import generate_password_hash, check_password_hash
 from flask_login import UserMixin
 
 # Initialize SQLAlchemy
 db = SQLAlchemy()
 
+# Ids are native 16-byte uuids on PostgreSQL and strings elsewhere; either way
+# they're handed to Python as strings
+_Id = String(36).with_variant(UUID(as_uuid=False), "postgresql")
+
+@lru_cache(maxsize=None)
+def _dummy_password_hash():
+    """Hash of a random password, computed once, to check against when a user has none"""
+    return generate_password_hash(secrets.token_hex(16))
+
+# Random bytes for new ids, read from the OS _ID_POOL_SIZE bytes at a time per
+# thread instead of one urandom() call per id
+_ID_POOL_SIZE = 4096
+_id_pool = threading.local()
+
+# A forked worker must not hand out the same ids as its parent
+os.register_at_fork(after_in_child=_id_pool.__dict__.clear)
+
+def _new_id():
+    """Generate a primary key as a canonical 36-character UUID4 string, filled in when the row is flushed"""
+    pool = getattr(_id_pool, "buffer", None)
+    offset = getattr(_id_pool, "offset", _ID_POOL_SIZE)
+    if pool is None or offset >= _ID_POOL_SIZE:
+        pool = _id_pool.buffer = os.urandom(_ID_POOL_SIZE)
+        offset = 0
+    _id_pool.offset = offset + 16
+    
+    # version=4 sets the version and RFC 4122 variant bits, as uuid.uuid4() does
+    return str(uuid.UUID(bytes=pool[offset:offset + 16], version=4))
+
 class User(UserMixin, db.Model):
     __tablename__ = 'users'
     
-    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = Column(_Id, primary_key=True, default=_new_id)
     name = Column(String(120))
     email = Column(String(120), unique=True, nullable=False)
     profile_picture = Column(String(256), nullable=True)
@@ -26,7 +59,6 @@ class User(UserMixin, db.Model):
     chats = relationship("Chat", back_populates="user")
     
     def __init__(self, email=None, name=None, password=None, profile_picture=None, firebase_uid=None):
-        self.id = str(uuid.uuid4())
         self.email = email
         self.name = name
         self.profile_picture = profile_picture
@@ -41,9 +73,14 @@ class User(UserMixin, db.Model):
         
     def check_password(self, password):
         """Check password against stored hash"""
-        if self.password_hash and password:
-            return check_password_hash(self.password_hash, password)
-        return False
+        if not password:
+            return False
+        if not self.password_hash:
+            # Still run the key derivation, so an account without a password
+            # takes as long to reject as a wrong password does
+            check_password_hash(_dummy_password_hash(), password)
+            return False
+        return check_password_hash(self.password_hash, password)
     
     def to_dict(self):
         return {
@@ -57,12 +94,17 @@ class User(UserMixin, db.Model):
 
 class Chat(db.Model):
     __tablename__ = 'chats'
+    __table_args__ = (
+        # A user's chats, most recently active first, for the chat list and
+        # for resuming the latest chat at login
+        Index('ix_chats_user_id_updated_at', 'user_id', 'updated_at'),
+    )
     
-    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = Column(_Id, primary_key=True, default=_new_id)
     db_type = Column(String(50), nullable=False)
     db_name = Column(String(100))
-    db_credentials = Column(Text)  # JSON string of database credentials
-    user_id = Column(String(36), ForeignKey('users.id'))  # Added for user relationship
+    db_credentials = Column(JSON().with_variant(JSONB, "postgresql"))  # Database credentials dict; binary jsonb on PostgreSQL
+    user_id = Column(_Id, ForeignKey('users.id'))  # Added for user relationship
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -71,29 +113,40 @@ class Chat(db.Model):
     user = relationship("User", back_populates="chats")
     
     def __init__(self, id=None, db_type=None, db_name=None, db_credentials=None, user_id=None):
-        self.id = id or str(uuid.uuid4())
+        if id is not None:
+            self.id = id
         self.db_type = db_type
         self.db_name = db_name
         self.db_credentials = db_credentials
         self.user_id = user_id
     
     def to_dict(self):
+        """
+        Serialize the chat for a JSON response
+        
+        Timestamps are left as datetimes for utils.json_dumps, which writes
+        them in ISO 8601 itself instead of formatting each one here.
+        """
         return {
             'id': self.id,
             'db_type': self.db_type,
             'db_name': self.db_name,
             'user_id': self.user_id,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
-            'message_count': len(self.messages) if self.messages else 0
+            'created_at': self.created_at,
+            'updated_at': self.updated_at,
+            'message_count': self.message_count or 0
         }
 
 
 class ChatMessage(db.Model):
     __tablename__ = 'chat_messages'
+    __table_args__ = (
+        # A chat's transcript is read in order, straight off this index
+        Index('ix_chat_messages_chat_id_created_at', 'chat_id', 'created_at'),
+    )
     
-    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    chat_id = Column(String(36), ForeignKey('chats.id'), nullable=False)
+    id = Column(_Id, primary_key=True, default=_new_id)
+    chat_id = Column(_Id, ForeignKey('chats.id'), nullable=False)
     query = Column(Text, nullable=False)
     generated_query = Column(Text)
     result = Column(Text)
@@ -107,7 +160,8 @@ class ChatMessage(db.Model):
     
     def __init__(self, id=None, chat_id=None, query=None, generated_query=None, 
                  result=None, explanation=None, error=None, is_error=False):
-        self.id = id or str(uuid.uuid4())
+        if id is not None:
+            self.id = id
         self.chat_id = chat_id
         self.query = query
         self.generated_query = generated_query
@@ -117,6 +171,7 @@ class ChatMessage(db.Model):
         self.is_error = is_error
     
     def to_dict(self):
+        """Serialize the message for a JSON response, leaving created_at to utils.json_dumps"""
         return {
             'id': self.id,
             'chat_id': self.chat_id,
@@ -126,5 +181,15 @@ class ChatMessage(db.Model):
             'explanation': self.explanation,
             'error': self.error,
             'is_error': self.is_error,
-            'created_at': self.created_at.isoformat() if self.created_at else None
+            'created_at': self.created_at
         }
+
+# Counted in SQL rather than by loading every message; deferred so only
+# queries that undefer() it, like the chat list, pay for the subquery
+Chat.message_count = column_property(
+    select(func.count(ChatMessage.id))
+    .where(ChatMessage.chat_id == Chat.id)
+    .correlate_except(ChatMessage)
+    .scalar_subquery(),
+    deferred=True
+)
@@ -2,11 +2,13 @@ import os
 import json
 import logging
 import datetime
+import string
+import threading
+from collections import OrderedDict
 from openai import OpenAI
-from utils import DateTimeEncoder
+from utils import json_dumps
 
 # Configure logging
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 # Initialize OpenAI client
@@ -20,6 +22,61 @@ MODEL = "gpt-4o"
 # Store the database schema analysis for reference during the session
 DATABASE_SCHEMA_ANALYSIS = {}
 
+# The query generation prompt, parsed once and filled in per request
+_QUERY_PROMPT = string.Template("""
+        You are a database query generator. Generate a query for a $db_type database based on the following natural language request:
+        
+        "$user_query"
+        
+        The database schema is as follows:
+        $schema_json
+        
+        Schema analysis:
+        $analysis_json
+        
+        Use the schema analysis to better understand the data model and relationships.
+        
+        Respond with JSON in the following format:
+        {
+            "query": "the generated query",
+            "explanation": "explanation of what the query does and why it satisfies the request"
+        }
+        
+        Ensure the query is valid for $db_type syntax.
+        """)
+
+# Indented JSON of recently prompted schemas, keyed by the dict's identity.
+# Connectors return the same cached schema dict until it expires, so repeat
+# questions reuse the dump; holding the dict keeps its id from being recycled.
+_SCHEMA_JSON_CACHE_SIZE = 256
+_schema_json_cache = OrderedDict()
+_schema_json_cache_lock = threading.Lock()
+
+def _schema_json(schema):
+    """
+    Dump a schema or schema analysis as indented JSON, reusing the last dump of the same dict
+    
+    Args:
+        schema (dict): The schema information or analysis
+        
+    Returns:
+        str: The indented JSON document
+    """
+    key = id(schema)
+    with _schema_json_cache_lock:
+        cached = _schema_json_cache.get(key)
+        if cached is not None and cached[0] is schema:
+            _schema_json_cache.move_to_end(key)
+            return cached[1]
+    
+    dumped = json_dumps(schema, indent=True)
+    with _schema_json_cache_lock:
+        _schema_json_cache[key] = (schema, dumped)
+        _schema_json_cache.move_to_end(key)
+        while len(_schema_json_cache) > _SCHEMA_JSON_CACHE_SIZE:
+            _schema_json_cache.popitem(last=False)
+    return dumped
+
 def generate_query(user_query, db_type, schema_info):
     """
     Generate a database query from a natural language query using OpenAI's GPT
@@ -38,27 +95,12 @@ def generate_query(user_query, db_type, schema_info):
         using_schema_analysis = bool(schema_analysis and schema_analysis.get('tables'))
         
         # Create a prompt that includes the database type, schema information, and schema analysis
-        prompt = f"""
-        You are a database query generator. Generate a query for a {db_type} database based on the following natural language request:
-        
-        "{user_query}"
-        
-        The database schema is as follows:
-        {json.dumps(schema_info, indent=2)}
-        
-        Schema analysis:
-        {json.dumps(schema_analysis, indent=2)}
-        
-        Use the schema analysis to better understand the data model and relationships.
-        
-        Respond with JSON in the following format:
-        {{
-            "query": "the generated query",
-            "explanation": "explanation of what the query does and why it satisfies the request"
-        }}
-        
-        Ensure the query is valid for {db_type} syntax.
-        """
+        prompt = _QUERY_PROMPT.substitute(
+            db_type=db_type,
+            user_query=user_query,
+            schema_json=_schema_json(schema_info),
+            analysis_json=_schema_json(schema_analysis)
+        )
         
         # Generate the query using OpenAI GPT
         response = openai.chat.completions.create(
@@ -118,16 +160,16 @@ def analyze_schema(db_type, schema_info):
         # Skip if we already have analysis for this database type
         cache_key = f"{db_type}_{hash(str(schema_info))}"
         if cache_key in DATABASE_SCHEMA_ANALYSIS:
-            logger.info(f"Using cached schema analysis for {db_type}")
+            logger.info("Using cached schema analysis for %s", db_type)
             return DATABASE_SCHEMA_ANALYSIS[cache_key]
         
-        logger.info(f"Analyzing schema for {db_type} database")
+        logger.info("Analyzing schema for %s database", db_type)
         
         # Create a prompt for schema analysis
         prompt = f"""
         You are a database expert. Analyze this {db_type} database schema and provide insights:
         
-        {json.dumps(schema_info, indent=2)}
+        {json_dumps(schema_info, indent=True)}
         
         Respond with JSON in the following format:
         {{
@@ -168,7 +210,7 @@ def analyze_schema(db_type, schema_info):
         
         return analysis
     except Exception as e:
-        logger.exception(f"Error analyzing schema: {str(e)}")
+        logger.exception("Error analyzing schema: %s", e)
         # Return a minimal analysis object if there's an error
         return {
             "schema_summary": f"Error analyzing schema: {str(e)}",
@@ -217,7 +259,7 @@ def format_response(db_result, user_query):
                         formatted_value = str(value)
                     elif isinstance(value, (dict, list)):
                         # Convert complex objects to JSON strings
-                        formatted_value = json.dumps(value, cls=DateTimeEncoder)
+                        formatted_value = json_dumps(value)
                     else:
                         formatted_value = str(value)
                     
@@ -241,7 +283,7 @@ def format_response(db_result, user_query):
             
             # Try to store the original data for export, but continue if it fails
             try:
-                json_data = json.dumps(db_result, cls=DateTimeEncoder)
+                json_data = json_dumps(db_result)
                 markdown_response += f"\n\n<div class='export-controls'>"
                 markdown_response += f"<button class='btn btn-sm btn-outline-secondary export-csv-btn ms-2'>Export CSV</button>"
                 markdown_response += "</div>"
@@ -249,18 +291,18 @@ def format_response(db_result, user_query):
                 markdown_response += json_data.replace('"', '&quot;')
                 markdown_response += "'></div>"
             except Exception as json_err:
-                logger.error(f"Error serializing to JSON: {str(json_err)}")
+                logger.error("Error serializing to JSON: %s", json_err)
                 # Skip export functionality but continue showing the results
             
         # If the result is a dictionary (common for NoSQL databases or aggregation results)
         elif isinstance(db_result, dict):
             try:
                 # Format as JSON in a code block
-                formatted_result = json.dumps(db_result, indent=2, cls=DateTimeEncoder)
+                formatted_result = json_dumps(db_result, indent=True)
                 markdown_response += f"```json\n{formatted_result}\n```"
                 
                 # Try to add export functionality
-                json_data = json.dumps(db_result, cls=DateTimeEncoder)
+                json_data = json_dumps(db_result)
                 markdown_response += f"\n\n<div class='export-controls'>"
                 markdown_response += f"<button class='btn btn-sm btn-outline-secondary export-json-btn'>Export JSON</button>"
                 markdown_response += "</div>"
@@ -268,7 +310,7 @@ def format_response(db_result, user_query):
                 markdown_response += json_data.replace('"', '&quot;')
                 markdown_response += "'></div>"
             except Exception as json_err:
-                logger.error(f"Error serializing dict to JSON: {str(json_err)}")
+                logger.error("Error serializing dict to JSON: %s", json_err)
                 # Fall back to just showing the basic string representation
                 markdown_response += f"```\n{str(db_result)}\n```"
                 
@@ -276,7 +318,7 @@ def format_response(db_result, user_query):
         else:
             try:
                 # Format as JSON in a code block
-                formatted_result = json.dumps(db_result, indent=2, cls=DateTimeEncoder)
+                formatted_result = json_dumps(db_result, indent=True)
                 markdown_response += f"```json\n{formatted_result}\n```"
                 
                 # Add count information for lists
@@ -289,7 +331,7 @@ def format_response(db_result, user_query):
                 
                 # Try to add export functionality
                 try:
-                    json_data = json.dumps(db_result, cls=DateTimeEncoder)
+                    json_data = json_dumps(db_result)
                     markdown_response += f"\n\n<div class='export-controls'>"
                     markdown_response += f"<button class='btn btn-sm btn-outline-secondary export-json-btn ms-2'>Export JSON</button>"
                     markdown_response += "</div>"
@@ -297,15 +339,15 @@ def format_response(db_result, user_query):
                     markdown_response += json_data.replace('"', '&quot;')
                     markdown_response += "'></div>"
                 except Exception as json_err:
-                    logger.error(f"Error serializing list to JSON: {str(json_err)}")
+                    logger.error("Error serializing list to JSON: %s", json_err)
                     # Skip export functionality
             except Exception as format_err:
-                logger.error(f"Error formatting as JSON: {str(format_err)}")
+                logger.error("Error formatting as JSON: %s", format_err)
                 # Fall back to just showing the basic string representation
                 markdown_response += f"```\n{str(db_result)}\n```"
         
         markdown_response += "</div>"
         return markdown_response
     except Exception as e:
-        logger.error(f"Error formatting response: {str(e)}")
+        logger.error("Error formatting response: %s", e)
         return f"Error formatting response: {str(e)}\n\nThe query executed correctly but the results couldn't be displayed properly due to formatting issues."
\ No newline at end of file
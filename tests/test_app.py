@@ -0,0 +1,92 @@
+import os
+import sqlite3
+
+import pytest
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+from app import app
+
+
+@pytest.fixture
+def client(tmp_path):
+    path = tmp_path / "test.db"
+    connection = sqlite3.connect(path)
+    connection.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, name TEXT)")
+    connection.commit()
+    connection.close()
+
+    client = app.test_client()
+    with client.session_transaction() as flask_session:
+        flask_session['database_credentials'] = {
+            'type': 'sqlite',
+            'credentials': {'path_to_database_file': str(path)}
+        }
+    client.db_path = path
+    return client
+
+
+def _rows(client):
+    connection = sqlite3.connect(client.db_path)
+    try:
+        return connection.execute("SELECT id, name FROM t ORDER BY id").fetchall()
+    finally:
+        connection.close()
+
+
+def test_execute_batch_list_rows(client):
+    response = client.post('/execute_batch', json={
+        'query': "INSERT INTO t (id, name) VALUES (?, ?)",
+        'rows': [[1, "a"], [2, "b"]]
+    })
+
+    assert response.status_code == 200, response.get_json()
+    assert _rows(client) == [(1, "a"), (2, "b")]
+
+
+def test_execute_batch_dict_rows(client):
+    response = client.post('/execute_batch', json={
+        'query': "INSERT INTO t (id, name) VALUES (?, ?)",
+        'columns': ["id", "name"],
+        'rows': [{"name": "a", "id": 1}, {"id": 2, "name": "b"}]
+    })
+
+    assert response.status_code == 200, response.get_json()
+    assert _rows(client) == [(1, "a"), (2, "b")]
+
+
+def test_execute_batch_dict_rows_use_first_row_keys(client):
+    response = client.post('/execute_batch', json={
+        'query': "INSERT INTO t (id, name) VALUES (?, ?)",
+        'rows': [{"id": 1, "name": "a"}, {"name": "b", "id": 2}]
+    })
+
+    assert response.status_code == 200, response.get_json()
+    assert _rows(client) == [(1, "a"), (2, "b")]
+
+
+@pytest.mark.parametrize("rows", [
+    [{"id": 1, "name": "a"}, {"id": 2}],
+    [[1, "a"], "b"],
+    {"id": 1, "name": "a"},
+])
+def test_execute_batch_rejects_malformed_rows(client, rows):
+    response = client.post('/execute_batch', json={
+        'query': "INSERT INTO t (id, name) VALUES (?, ?)",
+        'rows': rows
+    })
+
+    assert response.status_code == 400
+    assert response.get_json()['success'] is False
+    assert _rows(client) == []
+
+
+@pytest.mark.parametrize("chat_id", ["not-a-uuid", "1234"])
+def test_load_chat_with_malformed_id_is_not_found(client, chat_id):
+    response = client.get(f'/load_chat/{chat_id}')
+
+    assert response.get_json() == {
+        'success': False,
+        'message': f"Chat with ID {chat_id} not found"
+    }
@@ -0,0 +1,67 @@
+import sqlite3
+
+from database_connectors.relational import SQLiteConnector, _leading_keyword
+
+
+def _connector(tmp_path):
+    path = tmp_path / "test.db"
+    connection = sqlite3.connect(path)
+    connection.execute("CREATE TABLE t (id INTEGER PRIMARY KEY)")
+    connection.commit()
+    connection.close()
+    return SQLiteConnector({"path_to_database_file": str(path)})
+
+
+def test_leading_keyword_follows_cte_list():
+    assert _leading_keyword("WITH x AS (SELECT 9 AS a) INSERT INTO t(id) SELECT a FROM x") == "insert"
+    assert _leading_keyword("with x (a) as (select 1) update t set id = 2") == "update"
+    assert _leading_keyword("WITH x AS (SELECT ')delete(' AS s) SELECT * FROM x") == "select"
+    assert _leading_keyword("WITH RECURSIVE r(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM r WHERE n < 3) SELECT n FROM r") == "select"
+
+
+def test_with_insert_commits(tmp_path):
+    connector = _connector(tmp_path)
+
+    result, success, error = connector.execute_query(
+        "WITH x AS (SELECT 9 AS a) INSERT INTO t(id) SELECT a FROM x"
+    )
+
+    # sqlite3 only counts rows for statements that start with the DML keyword
+    assert success, error
+    assert "affected_rows" in result
+    rows, success, error = connector.execute_query("SELECT id FROM t")
+    assert rows == [{"id": 9}]
+
+
+def test_with_select_returns_rows(tmp_path):
+    connector = _connector(tmp_path)
+
+    rows, success, error = connector.execute_query("WITH x AS (SELECT 1 AS a) SELECT a FROM x")
+
+    assert success, error
+    assert rows == [{"a": 1}]
+
+
+def test_cached_schema_is_copied(tmp_path):
+    connector = _connector(tmp_path)
+    connector.refresh_schema()
+
+    schema = connector.get_schema()
+    schema["tables"].append({"name": "extra", "columns": []})
+    cached = connector.get_schema()
+    cached["tables"][0]["columns"].clear()
+
+    assert [table["name"] for table in connector.get_schema()["tables"]] == ["t"]
+    assert connector.get_schema()["tables"][0]["columns"]
+
+
+def test_failed_batch_is_rolled_back_inside_with_block(tmp_path):
+    connector = _connector(tmp_path)
+
+    with connector:
+        result, success, error = connector.execute_many("INSERT INTO t (id) VALUES (?)", [(1,), (1,)])
+        assert not success
+        rows, success, error = connector.execute_query("SELECT id FROM t")
+
+    assert success, error
+    assert rows == []
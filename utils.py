@@ -2,11 +2,74 @@ import json
 import datetime
 from decimal import Decimal
 
+# orjson is optional; responses fall back to the standard library encoder
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Custom JSON encoder for handling datetime objects and Decimal types
 class DateTimeEncoder(json.JSONEncoder):
     def default(self, o):
-        if isinstance(o, (datetime.datetime, datetime.date)):
+        if isinstance(o, (datetime.datetime, datetime.date, datetime.time)):
             return o.isoformat()
         elif isinstance(o, Decimal):
             return float(o)  # Convert Decimal to float for JSON serialization
-        return super().default(o)
\ No newline at end of file
+        return super().default(o)
+
+def _orjson_default(o):
+    """Serialize the types orjson doesn't handle natively"""
+    if isinstance(o, Decimal):
+        return float(o)
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+def json_dumps(obj, indent=False):
+    """
+    Serialize an object to a JSON string, converting datetime and Decimal values
+    
+    Uses orjson when it is installed and the DateTimeEncoder otherwise.
+    
+    Args:
+        obj (any): The object to serialize
+        indent (bool): Pretty-print with two-space indentation
+        
+    Returns:
+        str: The JSON document
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=_orjson_default, option=option).decode("utf-8")
+    return json.dumps(obj, indent=2 if indent else None, cls=DateTimeEncoder)
+
+def json_dumps_bytes(obj):
+    """
+    Serialize an object to compact UTF-8 encoded JSON, converting datetime and Decimal values
+    
+    Args:
+        obj (any): The object to serialize
+        
+    Returns:
+        bytes: The JSON document
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, default=_orjson_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, separators=(",", ":"), cls=DateTimeEncoder).encode("utf-8")
+
+def json_loads(data):
+    """
+    Parse a JSON document from str or bytes, with orjson when it is installed
+    
+    orjson's decode error subclasses json.JSONDecodeError, so callers can keep
+    catching the standard library exception.
+    
+    Args:
+        data (str or bytes): The JSON document
+        
+    Returns:
+        any: The parsed value
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)